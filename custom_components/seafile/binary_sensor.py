@@ -84,10 +84,15 @@ class SeafileBinarySensor(SeafileEntity, BinarySensorEntity):
 
         SeafileEntity.__init__(self, unique_id, description, updater, ENTITY_ID_FORMAT)
 
-        self._attr_available: bool = (
-            updater.data.get(ATTR_STATE, False)
-            if description.key != ATTR_STATE
-            else True
+        self._icons: tuple[str | None, str | None] = (
+            ICONS.get(f"{description.key}_{STATE_OFF}"),
+            ICONS.get(f"{description.key}_{STATE_ON}"),
+        )
+
+        self._is_state_sensor: bool = description.key == ATTR_STATE
+
+        self._attr_available: bool = self._is_state_sensor or updater.data.get(
+            ATTR_STATE, False
         )
 
         self._attr_is_on = updater.data.get(description.key, False)
@@ -96,13 +101,13 @@ class SeafileBinarySensor(SeafileEntity, BinarySensorEntity):
     def _handle_coordinator_update(self) -> None:
         """Update state."""
 
-        is_available: bool = (
-            self._updater.data.get(ATTR_STATE, False)
-            if self.entity_description.key != ATTR_STATE
-            else True
-        )
+        if not self._is_data_changed():
+            return
+
+        data: dict = self._updater.data
 
-        is_on: bool = self._updater.data.get(self.entity_description.key, False)
+        is_on: bool = data.get(self.entity_description.key, False)
+        is_available: bool = self._is_state_sensor or data.get(ATTR_STATE, False)
 
         if self._attr_is_on == is_on and self._attr_available == is_available:  # type: ignore
             return
@@ -120,9 +125,5 @@ class SeafileBinarySensor(SeafileEntity, BinarySensorEntity):
         :param is_on: bool
         """
 
-        icon_name: str = (
-            f"{self.entity_description.key}_{STATE_ON if is_on else STATE_OFF}"
-        )
-
-        if icon_name in ICONS:
-            self._attr_icon = ICONS[icon_name]
+        if icon := self._icons[bool(is_on)]:
+            self._attr_icon = icon
@@ -2,19 +2,30 @@
 
 from __future__ import annotations
 
-import json
+import asyncio
 import logging
+import time
 from datetime import datetime
-from typing import Any
+from typing import Any, cast
 
+import orjson
 from homeassistant.const import CONF_PASSWORD, CONF_TOKEN, CONF_TYPE, CONF_USERNAME
-from httpx import AsyncClient, ConnectError, HTTPError, Response, TransportError
+from httpx import (
+    AsyncClient,
+    ConnectError,
+    HTTPError,
+    Response,
+    TransportError,
+    codes,
+)
 
 from .const import (
     CLIENT_URL,
     DEFAULT_TIMEOUT,
     DIAGNOSTIC_CONTENT,
+    DIAGNOSTIC_CONTENT_LENGTH,
     DIAGNOSTIC_DATE_TIME,
+    DIAGNOSTIC_MAX_REQUESTS,
     DIAGNOSTIC_MESSAGE,
     THUMBNAIL_SIZE,
 )
@@ -35,6 +46,7 @@ class SeafileClient:
     _username: str
     _password: str
     _token: str | None = None
+    _headers: dict[str, str]
 
     def __init__(
         self,
@@ -61,6 +73,8 @@ class SeafileClient:
 
         self._username = username
         self._password = password
+        self._headers = {}
+        self._login_lock: asyncio.Lock = asyncio.Lock()
 
         self.diagnostics: dict[str, Any] = {}
 
@@ -70,6 +84,8 @@ class SeafileClient:
         body: dict | None = None,
         string_response: bool = False,
         full_path: bool = False,
+        binary_response: bool = False,
+        is_retry: bool = False,
     ) -> dict | list | str | bytes:
         """Request method.
 
@@ -77,41 +93,63 @@ class SeafileClient:
         :param body: dict | None: api body
         :param string_response: bool: Is string response
         :param full_path: bool: Is full path
+        :param binary_response: bool: Is binary response
+        :param is_retry: bool: Is retry after reauthorization
         :return dict | list | str | bytes: dict or list or str or bytes with api data.
         """
 
         _url: str = path if full_path else f"{self._url}/{path}/"
+        _headers: dict[str, str] = self._headers
 
         try:
-            async with self._client as client:
-                response: Response = await client.get(
-                    _url,
-                    params=body,
-                    headers={"Authorization": f"Token {self._token}"},
-                    timeout=self._timeout,
-                )
+            response: Response = await self._client.get(
+                _url,
+                params=body,
+                headers=_headers,
+                timeout=self._timeout,
+            )
 
             self._debug("Successful request", _url, response.content, path)
 
+            is_unauthorized: bool = (
+                response.status_code == codes.UNAUTHORIZED and not is_retry
+            )
+
+            if binary_response and response.status_code < 400:
+                return response.content
+
             if string_response and response.status_code < 400:
                 try:
                     return response.content.decode("utf-8")
                 except UnicodeDecodeError:
                     return response.content
 
-            _data: dict | list = json.loads(response.content)
+            # A 401 body may not be JSON, e.g. a proxy login page
+            _data: dict | list = (
+                [] if is_unauthorized else orjson.loads(response.content)
+            )
         except (
             HTTPError,
             ConnectError,
             TransportError,
             ValueError,
             TypeError,
-            json.JSONDecodeError,
+            orjson.JSONDecodeError,
         ) as _e:
             self._debug("Connection error", _url, _e, path)
 
             raise SeafileConnectionError("Connection error") from _e
 
+        if is_unauthorized:
+            # Concurrent requests share one re-login
+            async with self._login_lock:
+                if self._headers is _headers:
+                    await self.login()
+
+            return await self.request(
+                path, body, string_response, full_path, binary_response, True
+            )
+
         if response.status_code >= 400:
             self._raise(_data)
 
@@ -124,26 +162,25 @@ class SeafileClient:
         _url: str = f"{self._url}/{_path}/"
 
         try:
-            async with self._client as client:
-                response: Response = await client.post(
-                    _url,
-                    data={
-                        CONF_USERNAME: self._username,
-                        CONF_PASSWORD: self._password,
-                    },
-                    timeout=self._timeout,
-                )
+            response: Response = await self._client.post(
+                _url,
+                data={
+                    CONF_USERNAME: self._username,
+                    CONF_PASSWORD: self._password,
+                },
+                timeout=self._timeout,
+            )
 
             self._debug("Successful request", _url, response.content, _path)
 
-            _data: dict = json.loads(response.content)
+            _data: dict = orjson.loads(response.content)
         except (
             HTTPError,
             ConnectError,
             TransportError,
             ValueError,
             TypeError,
-            json.JSONDecodeError,
+            orjson.JSONDecodeError,
         ) as _e:
             self._debug("Connection error", _url, _e, _path)
 
@@ -154,6 +191,7 @@ class SeafileClient:
 
         if CONF_TOKEN in _data:
             self._token = _data.get(CONF_TOKEN)
+            self._headers = {"Authorization": f"Token {self._token}"}
 
     async def account(self) -> dict:
         """Get account info
@@ -161,7 +199,7 @@ class SeafileClient:
         :return dict: Response data
         """
 
-        return dict(await self.request("account/info"))  # type: ignore
+        return cast(dict, await self.request("account/info"))
 
     async def server(self) -> dict:
         """Get server info
@@ -169,7 +207,7 @@ class SeafileClient:
         :return dict: Response data
         """
 
-        return dict(await self.request("server-info"))  # type: ignore
+        return cast(dict, await self.request("server-info"))
 
     async def libraries(self) -> list:
         """Get libraries
@@ -177,7 +215,7 @@ class SeafileClient:
         :return list: Response data
         """
 
-        return list(await self.request("repos", {CONF_TYPE: "mine"}))
+        return cast(list, await self.request("repos", {CONF_TYPE: "mine"}))
 
     async def directories(self, repo_id: str, path: str | None = None) -> list:
         """Get directories
@@ -187,10 +225,27 @@ class SeafileClient:
         :return list: Response data
         """
 
-        return list(
-            await self.request(f"repos/{repo_id}/dir", {"p": path} if path else None)
+        return cast(
+            list,
+            await self.request(f"repos/{repo_id}/dir", {"p": path} if path else None),
+        )
+
+    async def directories_many(
+        self, repo_ids: list[str], path: str | None = None
+    ) -> dict[str, list]:
+        """Get directories for several libraries concurrently
+
+        :param repo_ids: list[str]
+        :param path: str | None
+        :return dict[str, list]: Response data by repo id
+        """
+
+        results: list = await asyncio.gather(
+            *(self.directories(repo_id, path) for repo_id in repo_ids)
         )
 
+        return dict(zip(repo_ids, results))
+
     async def file(
         self, repo_id: str, path: str, as_bytes: bool = False
     ) -> str | bytes:
@@ -202,15 +257,17 @@ class SeafileClient:
         :return str | bytes: Response str | bytes
         """
 
-        url: str = str(
-            await self.request(f"repos/{repo_id}/file", {"p": path, "reuse": 1}, True)
+        url: str = cast(
+            str,
+            await self.request(f"repos/{repo_id}/file", {"p": path, "reuse": 1}, True),
         )
 
         if as_bytes:  # pragma: no cover
-            return bytes(
-                await self.request(  # type: ignore
-                    url.strip('"'), string_response=True, full_path=True
-                )
+            return cast(
+                bytes,
+                await self.request(
+                    url.strip('"'), full_path=True, binary_response=True
+                ),
             )
 
         return url
@@ -228,10 +285,13 @@ class SeafileClient:
 
         path = path.strip("/")
 
-        return bytes(
-            await self.request(  # type: ignore
-                f"repos/{repo_id}/thumbnail", {"p": f"/{path}", "size": size}, True
-            )
+        return cast(
+            bytes,
+            await self.request(
+                f"repos/{repo_id}/thumbnail",
+                {"p": f"/{path}", "size": size},
+                binary_response=True,
+            ),
         )
 
     @staticmethod
@@ -244,21 +304,13 @@ class SeafileClient:
         if not response or isinstance(response, list):
             raise SeafileRequestError("Request error.")
 
-        _errors: list = []
-
-        for field, errors in response.items():
-            if not errors:
-                continue
-
-            if isinstance(errors, str):
-                _errors.append(errors)
+        _errors: list = [
+            errors if isinstance(errors, str) else f"{field}: " + "; ".join(errors)
+            for field, errors in response.items()
+            if errors and isinstance(errors, (str, list))
+        ]
 
-                continue
-
-            if isinstance(errors, list):
-                _errors.append(f"{field}: " + "; ".join(errors))
-
-        raise SeafileRequestError(".\n".join(_errors) if _errors else "Request error.")
+        raise SeafileRequestError(".\n".join(_errors) or "Request error.")
 
     def _debug(self, message: str, url: str, content: Any, path: str) -> None:
         """Debug log
@@ -269,17 +321,25 @@ class SeafileClient:
         :param path: str: Path
         """
 
-        _LOGGER.debug("%s (%s): %s", message, url, str(content))
-
-        _content: dict | str = {}
+        _LOGGER.debug("%s (%s): %s", message, url, content)
 
-        try:
-            _content = json.loads(content)
-        except (ValueError, TypeError):  # pragma: no cover
-            _content = str(content)
-
-        self.diagnostics[path] = {
-            DIAGNOSTIC_DATE_TIME: datetime.now().replace(microsecond=0).isoformat(),
+        _diagnostic: dict[str, Any] = {
+            DIAGNOSTIC_DATE_TIME: datetime.fromtimestamp(int(time.time())).isoformat(),
             DIAGNOSTIC_MESSAGE: message,
-            DIAGNOSTIC_CONTENT: _content,
         }
+
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            try:
+                _diagnostic[DIAGNOSTIC_CONTENT] = orjson.loads(content)
+            except (ValueError, TypeError):  # pragma: no cover
+                _diagnostic[DIAGNOSTIC_CONTENT] = str(content)
+        elif isinstance(content, bytes):
+            _diagnostic[DIAGNOSTIC_CONTENT_LENGTH] = len(content)
+        else:
+            _diagnostic[DIAGNOSTIC_CONTENT] = str(content)
+
+        self.diagnostics.pop(path, None)
+        self.diagnostics[path] = _diagnostic
+
+        while len(self.diagnostics) > DIAGNOSTIC_MAX_REQUESTS:
+            del self.diagnostics[next(iter(self.diagnostics))]
@@ -17,6 +17,7 @@ PLATFORMS: Final = [
 ]
 
 THUMBNAIL_SIZE: Final = 256
+THUMBNAIL_CACHE_SIZE: Final = 256
 
 MIMETYPE_HEIC: Final = "image/heic"
 MIMETYPE_JPEG: Final = "image/jpeg"
@@ -25,12 +26,15 @@ MIMETYPE_JPEG: Final = "image/jpeg"
 DIAGNOSTIC_DATE_TIME: Final = "date_time"
 DIAGNOSTIC_MESSAGE: Final = "message"
 DIAGNOSTIC_CONTENT: Final = "content"
+DIAGNOSTIC_CONTENT_LENGTH: Final = "content_length"
+DIAGNOSTIC_MAX_REQUESTS: Final = 20
 
 """Helper const"""
 UPDATER: Final = "updater"
 UPDATE_LISTENER: Final = "update_listener"
 OPTION_IS_FROM_FLOW: Final = "is_from_flow"
 SIGNAL_NEW_SENSOR: Final = f"{DOMAIN}-new-sensor"
+HTTPX_CLIENT: Final = f"{DOMAIN}_httpx_client"
 
 """Default settings"""
 DEFAULT_SCAN_INTERVAL: Final = 7
@@ -40,6 +44,9 @@ DEFAULT_SLEEP: Final = 3
 
 """Seafile API client const"""
 CLIENT_URL: Final = "{url}/api2"
+CLIENT_MAX_CONNECTIONS: Final = 20
+CLIENT_MAX_KEEPALIVE_CONNECTIONS: Final = 20
+CLIENT_KEEPALIVE_EXPIRY: Final = 75
 
 """Attributes"""
 ATTR_STATE: Final = "state"
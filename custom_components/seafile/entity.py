@@ -40,6 +40,8 @@ class SeafileEntity(CoordinatorEntity):
 
         self.entity_description = description
         self._updater: SeafileUpdater = updater
+        # No snapshot yet, so the first coordinator update always renders
+        self._data: dict | None = None
 
         self.entity_id = generate_entity_id(
             entity_id_format,
@@ -58,6 +60,9 @@ class SeafileEntity(CoordinatorEntity):
 
         await CoordinatorEntity.async_added_to_hass(self)
 
+        # Entities created during an update were built from the previous snapshot
+        self._handle_coordinator_update()
+
     @property
     def available(self) -> bool:
         """Is available
@@ -67,6 +72,19 @@ class SeafileEntity(CoordinatorEntity):
 
         return self._attr_available and self.coordinator.last_update_success
 
+    def _is_data_changed(self) -> bool:
+        """Check whether the updater published a new data snapshot
+
+        :return bool: Is changed
+        """
+
+        if self._updater.data is self._data:
+            return False
+
+        self._data = self._updater.data
+
+        return True
+
     def _handle_coordinator_update(self) -> None:
         """Update state."""
 
@@ -1,7 +1,7 @@
 """Seafile API client exceptions."""
 
 
-class SeafileError(BaseException):
+class SeafileError(Exception):
     """Seafile error"""
 
 
@@ -3,7 +3,11 @@
 from __future__ import annotations
 
 import logging
-from typing import Any
+import mimetypes
+import os
+import re
+from functools import lru_cache
+from typing import Any, Final
 from urllib.parse import quote_plus, unquote_plus
 from uuid import UUID
 
@@ -13,11 +17,26 @@ from homeassistant.loader import async_get_integration
 from homeassistant.util import slugify
 from httpx import codes
 
+from .client import SeafileClient
 from .const import DEFAULT_TIMEOUT, DOMAIN
-from .updater import SeafileUpdater
+from .exceptions import SeafileConnectionError, SeafileRequestError
+from .updater import async_get_client
+
+# Parentheses must be removed, they break the link in css
+PATH_ENCODE_MAP: Final = {"(": "|28|", ")": "|29|"}
+PATH_DECODE_MAP: Final = {code: char for char, code in PATH_ENCODE_MAP.items()}
+
+PATH_ENCODE_RE: Final = re.compile(r"[()]")
+PATH_DECODE_RE: Final = re.compile(r"\|2[89]\|")
+
+UUID4_RE: Final = re.compile(
+    r"[0-9a-f]{8}-[0-9a-f]{4}-4[0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}"
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+_VERSION: str | None = None
+
 
 def get_config_value(
     config_entry: config_entries.ConfigEntry | None, param: str, default=None
@@ -54,19 +73,17 @@ async def async_verify_access(  # pylint: disable=too-many-arguments
     :return int: last update success
     """
 
-    updater = SeafileUpdater(
-        hass=hass,
-        url=url,
-        username=username,
-        password=password,
-        timeout=timeout,
-        is_only_check=True,
-    )
+    client = SeafileClient(async_get_client(hass), url, username, password, timeout)
 
-    await updater.async_request_refresh()
-    await updater.async_stop()
+    try:
+        await client.login()
+        await client.server()
+    except SeafileConnectionError:
+        return codes.NOT_FOUND
+    except SeafileRequestError:
+        return codes.FORBIDDEN
 
-    return updater.code
+    return codes.OK
 
 
 async def async_get_version(hass: HomeAssistant) -> str:
@@ -76,11 +93,17 @@ async def async_get_version(hass: HomeAssistant) -> str:
     :return str: Documentation URL
     """
 
-    integration = await async_get_integration(hass, DOMAIN)
+    global _VERSION  # pylint: disable=global-statement
+
+    if _VERSION is None:
+        integration = await async_get_integration(hass, DOMAIN)
 
-    return f"{integration.version}"
+        _VERSION = f"{integration.version}"
 
+    return _VERSION
 
+
+@lru_cache(maxsize=1024)
 def generate_entity_id(
     entity_id_format: str, username: str, name: str | None = None
 ) -> str:
@@ -97,6 +120,7 @@ def generate_entity_id(
     return entity_id_format.format(slugify(f"{DOMAIN}_{username}{_name}".lower()))
 
 
+@lru_cache(maxsize=512)
 def is_valid_uuid(uuid: str, version: int = 4) -> bool:
     """Check if uuid is a valid UUID.
 
@@ -105,6 +129,9 @@ def is_valid_uuid(uuid: str, version: int = 4) -> bool:
     :return bool
     """
 
+    if version == 4:
+        return UUID4_RE.fullmatch(uuid) is not None
+
     try:
         uuid_object = UUID(uuid, version=version)
     except ValueError:
@@ -113,6 +140,30 @@ def is_valid_uuid(uuid: str, version: int = 4) -> bool:
     return str(uuid_object) == uuid
 
 
+def guess_mime(path: str) -> str | None:
+    """Guess mime by file extension
+
+    :param path: str
+    :return str | None
+    """
+
+    return _guess_extension_mime(os.path.splitext(path)[1].lower())
+
+
+@lru_cache(maxsize=4096)
+def _guess_extension_mime(extension: str) -> str | None:
+    """Guess mime for extension
+
+    :param extension: str
+    :return str | None
+    """
+
+    mime, _ = mimetypes.guess_type(f"file{extension}")
+
+    return mime
+
+
+@lru_cache(maxsize=256)
 def get_short_mime(mime: str | None) -> str | None:
     """Get short mime
 
@@ -123,11 +174,10 @@ def get_short_mime(mime: str | None) -> str | None:
     if mime is None:
         return None
 
-    path: list = mime.split("/")
-
-    return path[0]
+    return mime.partition("/")[0]
 
 
+@lru_cache(maxsize=2048)
 def encode_path(path: str) -> str:
     """Encode path
 
@@ -135,13 +185,12 @@ def encode_path(path: str) -> str:
     :return str
     """
 
-    # Parentheses must be removed, they break the link in css
-    for chars in (("(", "|28|"), (")", "|29|")):
-        path = path.replace(*chars)
+    path = PATH_ENCODE_RE.sub(lambda match: PATH_ENCODE_MAP[match.group()], path)
 
     return quote_plus(path, "/").strip("/")
 
 
+@lru_cache(maxsize=2048)
 def decode_path(path: str) -> str:
     """Decode path
 
@@ -149,9 +198,6 @@ def decode_path(path: str) -> str:
     :return str
     """
 
-    path = unquote_plus(path)
-
-    for chars in (("|28|", "("), ("|29|", ")")):
-        path = path.replace(*chars)
-
-    return path
+    return PATH_DECODE_RE.sub(
+        lambda match: PATH_DECODE_MAP[match.group()], unquote_plus(path)
+    )
@@ -5,8 +5,8 @@ from __future__ import annotations
 
 import contextlib
 import logging
-import mimetypes
 from operator import itemgetter
+from typing import Final
 
 from homeassistant.components.media_player.const import (
     MEDIA_CLASS_APP,
@@ -37,10 +37,12 @@ from .const import (
     THUMBNAIL_SIZE,
 )
 from .exceptions import SeafileError
-from .helper import get_short_mime, is_valid_uuid
+from .helper import get_short_mime, guess_mime, is_valid_uuid
 from .updater import SeafileUpdater, async_get_updater
 from .views import async_generate_thumbnail_url
 
+MEDIA_MIMES: Final = frozenset(MEDIA_MIME_TYPES)
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -75,7 +77,8 @@ class SeafileMediaSource(MediaSource):
         :return PlayMedia
         """
 
-        path: list = item.identifier.split("/")
+        path: list = item.identifier.split("/", 2)
+        file_path: str = f"/{path[2]}" if len(path) > 2 else "/"
 
         if not is_valid_uuid(path[1]):
             raise Unresolvable(f"Unable to find library with id: {path[1]}")
@@ -85,18 +88,18 @@ class SeafileMediaSource(MediaSource):
         except ValueError as _e:
             raise Unresolvable(f"Unable to find entry with id: {path[0]}") from _e
 
-        mime, _ = mimetypes.guess_type(path[-1])
+        mime: str | None = guess_mime(file_path)
 
         url: str = ""
 
         if mime == MIMETYPE_HEIC:  # pragma: no cover
             url = async_generate_thumbnail_url(
-                _get_host(self.hass), path[0], path[1], f"/{'/'.join(path[2:])}", 0
+                _get_host(self.hass), path[0], path[1], file_path, 0
             )
             mime = MIMETYPE_JPEG
         else:
             try:
-                url = await updater.client.file(path[1], f"/{'/'.join(path[2:])}")  # type: ignore
+                url = await updater.client.file(path[1], file_path)  # type: ignore
             except SeafileError as _e:
                 raise Unresolvable(
                     f"Could not resolve media item: {item.identifier}"
@@ -114,7 +117,7 @@ class SeafileMediaSource(MediaSource):
         if not item.identifier:
             return self._build_root()
 
-        path: list = item.identifier.split("/")
+        path: list = item.identifier.split("/", 2)
 
         if len(path) == 1:
             return self._build_entry(item.identifier)
@@ -136,10 +139,15 @@ class SeafileMediaSource(MediaSource):
                 .get(ATTR_REPOSITORY_NAME, "Library"),
             )
         else:
-            source: BrowseMediaSource = self._build_dir(item.identifier, path[-1])  # type: ignore
+            source: BrowseMediaSource = self._build_dir(  # type: ignore
+                item.identifier, path[2].rsplit("/", 1)[-1]
+            )
 
         source.children = await self._build_path(
-            updater, item.identifier, path[1], f"/{'/'.join(path[2:])}"
+            updater,
+            item.identifier,
+            path[1],
+            f"/{path[2]}" if len(path) > 2 else "/",
         )
 
         return source
@@ -158,9 +166,10 @@ class SeafileMediaSource(MediaSource):
             title=self.name,
             can_play=False,
             can_expand=True,
+            # hass.data already tracks loaded entries, kept in sync on setup/unload
             children=[
-                self._build_entry(entry.entry_id)
-                for entry in self.hass.config_entries.async_entries(DOMAIN)
+                self._build_entry(entry_id)
+                for entry_id in tuple(self.hass.data.get(DOMAIN, {}))
             ],
             children_media_class=MEDIA_CLASS_APP,
         )
@@ -239,16 +248,20 @@ class SeafileMediaSource(MediaSource):
             children_media_class=MEDIA_CLASS_DIRECTORY,
         )
 
-    def _build_file(self, identifier: str, name: str, mime: str) -> BrowseMediaSource:
+    def _build_file(
+        self, host: str, identifier: str, name: str, mime: str, mtime: int = 0
+    ) -> BrowseMediaSource:
         """Build the media sources for file.
 
+        :param host: str
         :param identifier: str
         :param name: str
         :param mime: str
+        :param mtime: int
         :return BrowseMediaSource
         """
 
-        path: list = identifier.split("/")
+        path: list = identifier.split("/", 2)
 
         return BrowseMediaSource(
             domain=DOMAIN,
@@ -256,11 +269,12 @@ class SeafileMediaSource(MediaSource):
             media_class=MEDIA_CLASS_MAP[mime],
             media_content_type=MEDIA_CLASS_MAP[mime],
             thumbnail=async_generate_thumbnail_url(
-                _get_host(self.hass),
+                host,
                 path[0],
                 path[1],
-                f"{'/'.join(path[2:])}/{name}",
+                f"{path[2] if len(path) > 2 else ''}/{name}",
                 THUMBNAIL_SIZE,
+                mtime,
             ),
             title=name,
             can_play=True,
@@ -285,34 +299,38 @@ class SeafileMediaSource(MediaSource):
         except SeafileError as _e:
             raise MediaSourceError(f"Unable to find path: {path}") from _e
 
-        directories: list = sorted(
-            [element for element in response if element.get("type", None) == "dir"],
-            key=itemgetter("name", "mtime"),
-        )
+        directories: list = []
+        files: list = []
+
+        for element in response:
+            _type: str | None = element.get("type", None)
+
+            if _type == "dir":
+                directories.append(element)
+            elif _type == "file":
+                mime: str | None = get_short_mime(guess_mime(element.get("name")))
+
+                if mime in MEDIA_MIMES:
+                    files.append((element, mime))
+
+        directories.sort(key=itemgetter("name", "mtime"))
+        files.sort(key=lambda file: (file[0]["mtime"], file[0]["name"]), reverse=True)
 
         sources = [
             self._build_dir(identifier, directory.get("name").replace("&nbsp", ""))
             for directory in directories
         ]
 
-        files: list = sorted(
-            [element for element in response if element.get("type", None) == "file"],
-            key=itemgetter("mtime", "name"),
-            reverse=True,
-        )
-
-        for file in files:
-            mime, _ = mimetypes.guess_type(file.get("name"))
-            mime = get_short_mime(mime)
-
-            if mime not in MEDIA_MIME_TYPES:
-                continue
+        host: str = _get_host(self.hass) if files else ""
 
+        for file, mime in files:
             sources.append(
                 self._build_file(
+                    host,
                     identifier,
                     file.get("name").replace("&nbsp", ""),
                     mime,  # type: ignore
+                    file.get("mtime", 0),
                 )
             )
 
@@ -325,8 +343,8 @@ def _get_host(hass: HomeAssistant) -> str:
     :param hass: HomeAssistant
     :return str
     """
-    host: str = get_url(hass)
+
     with contextlib.suppress(NoURLAvailableError):
-        host = get_url(hass, require_current_request=True)
+        return get_url(hass, require_current_request=True)
 
-    return host
+    return get_url(hass)
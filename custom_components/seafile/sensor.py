@@ -3,7 +3,8 @@
 from __future__ import annotations
 
 import logging
-from typing import Any
+from types import MappingProxyType
+from typing import Any, Final
 
 from homeassistant.components.sensor import ENTITY_ID_FORMAT, SensorEntity
 from homeassistant.config_entries import ConfigEntry
@@ -17,6 +18,8 @@ from .updater import SeafileEntityDescription, SeafileUpdater, async_get_updater
 
 PARALLEL_UPDATES = 0
 
+EMPTY: Final = MappingProxyType({})
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -83,34 +86,20 @@ class SeafileSensor(SeafileEntity, SensorEntity):
         self._attr_repository_code = entity.repository_code
         self._attr_custom_key = entity.custom_key
 
-        if self._attr_repository_code is not None:
-            self._attr_native_value = (
-                self._updater.data.get(ATTR_REPOSITORIES, {})
-                .get(self._attr_repository_code, {})
-                .get(self._attr_custom_key, None)
-            )
-        else:
-            self._attr_native_value = self._updater.data.get(
-                entity.description.key, None
-            )
+        self._attr_native_value = self._get_state(updater.data)
 
         self._attr_device_info = entity.device_info
 
     def _handle_coordinator_update(self) -> None:
         """Update state."""
 
-        is_available: bool = self._updater.data.get(ATTR_STATE, False)
+        if not self._is_data_changed():
+            return
 
-        state: Any = None
+        data: dict = self._updater.data
 
-        if self._attr_repository_code is not None:
-            state = (
-                self._updater.data.get(ATTR_REPOSITORIES, {})
-                .get(self._attr_repository_code, {})
-                .get(self._attr_custom_key, None)
-            )
-        else:
-            state = self._updater.data.get(self.entity_description.key, None)
+        is_available: bool = data.get(ATTR_STATE, False)
+        state: Any = self._get_state(data)
 
         if (
             self._attr_native_value == state
@@ -122,3 +111,19 @@ class SeafileSensor(SeafileEntity, SensorEntity):
         self._attr_native_value = state
 
         self.async_write_ha_state()
+
+    def _get_state(self, data: dict) -> Any:
+        """Get state from updater data
+
+        :param data: dict: Updater data
+        :return Any: State
+        """
+
+        if self._attr_repository_code is None:
+            return data.get(self.entity_description.key, None)
+
+        return (
+            data.get(ATTR_REPOSITORIES, EMPTY)
+            .get(self._attr_repository_code, EMPTY)
+            .get(self._attr_custom_key, None)
+        )
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from dataclasses import dataclass
 from datetime import timedelta
@@ -19,10 +20,10 @@ from homeassistant.helpers.entity import (
     EntityCategory,
     EntityDescription,
 )
-from homeassistant.helpers.httpx_client import get_async_client
+from homeassistant.helpers.httpx_client import create_async_httpx_client
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 from homeassistant.util import utcnow
-from httpx import codes
+from httpx import AsyncClient, AsyncHTTPTransport, Limits, codes
 
 from .client import SeafileClient
 from .const import (
@@ -32,9 +33,13 @@ from .const import (
     ATTR_REPOSITORY_NAME,
     ATTR_REPOSITORY_SIZE,
     ATTR_STATE,
+    CLIENT_KEEPALIVE_EXPIRY,
+    CLIENT_MAX_CONNECTIONS,
+    CLIENT_MAX_KEEPALIVE_CONNECTIONS,
     DEFAULT_SCAN_INTERVAL,
     DEFAULT_TIMEOUT,
     DOMAIN,
+    HTTPX_CLIENT,
     MAINTAINER,
     NAME,
     SIGNAL_NEW_SENSOR,
@@ -48,6 +53,11 @@ PREPARE_METHODS: Final = (
     "libraries",
 )
 
+SPACE_SENSORS: Final = {
+    "total": ("space_total", "Space total"),
+    "usage": ("space_usage", "Space usage"),
+}
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -64,8 +74,8 @@ class SeafileUpdater(DataUpdateCoordinator):
     new_sensor_callback: CALLBACK_TYPE | None = None
 
     _scan_interval: int
-    _is_only_check: bool = False
     _is_reauthorization: bool = True
+    _sw_version: str | None = None
 
     def __init__(
         self,
@@ -75,7 +85,6 @@ class SeafileUpdater(DataUpdateCoordinator):
         password: str,
         scan_interval: int = DEFAULT_SCAN_INTERVAL,
         timeout: int = DEFAULT_TIMEOUT,
-        is_only_check: bool = False,
     ) -> None:
         """Initialize updater.
 
@@ -86,13 +95,12 @@ class SeafileUpdater(DataUpdateCoordinator):
         :param password: str: Password
         :param scan_interval: int: Update interval
         :param timeout: int: Query execution timeout
-        :param is_only_check: bool: Only config flow
         """
 
         url = url.removesuffix("/")
 
         self.client = SeafileClient(
-            get_async_client(hass, False),
+            async_get_client(hass),
             url,
             username,
             password,
@@ -103,7 +111,6 @@ class SeafileUpdater(DataUpdateCoordinator):
         self.url = url
 
         self._scan_interval = scan_interval
-        self._is_only_check = is_only_check
 
         if hass is not None:
             super().__init__(
@@ -145,13 +152,29 @@ class SeafileUpdater(DataUpdateCoordinator):
 
         _err: SeafileError | None = None
 
+        # Build a fresh snapshot so entities can detect changes by identity,
+        # it is only published once complete
+        _previous: dict[str, Any] = self.data
+        data: dict[str, Any] = _previous | {
+            ATTR_REPOSITORIES: dict(_previous.get(ATTR_REPOSITORIES, {}))
+        }
+
         try:
             if self._is_reauthorization or self._is_first_update:
                 await self.client.login()
 
-            for method in PREPARE_METHODS:
-                if not self._is_only_check or method == "server":
-                    await self._async_prepare(method, self.data)
+            # Fetch concurrently, but apply in order so that the server version
+            # is known before the first sensors capture device_info
+            responses: list = await asyncio.gather(
+                *(getattr(self.client, method)() for method in PREPARE_METHODS),
+                return_exceptions=True,
+            )
+
+            for method, response in zip(PREPARE_METHODS, responses):
+                if isinstance(response, BaseException):
+                    raise response
+
+                self._prepare(method, response, data)
         except SeafileConnectionError as _e:
             _err = _e
 
@@ -168,11 +191,13 @@ class SeafileUpdater(DataUpdateCoordinator):
             if self._is_first_update:
                 self._is_first_update = False
 
-        self.data[ATTR_STATE] = codes.is_success(self.code)
+        data[ATTR_STATE] = codes.is_success(self.code)
+
+        self.data = _previous if data == _previous else data
 
         return self.data
 
-    @property
+    @cached_property
     def device_info(self) -> DeviceInfo:
         """Device info.
 
@@ -184,7 +209,7 @@ class SeafileUpdater(DataUpdateCoordinator):
             identifiers={(DOMAIN, self.username)},
             name=self.username,
             manufacturer=MAINTAINER,
-            sw_version=self.data.get(ATTR_DEVICE_SW_VERSION, None),
+            sw_version=self._sw_version,
             configuration_url=self.url,
         )
 
@@ -204,66 +229,75 @@ class SeafileUpdater(DataUpdateCoordinator):
             utcnow().replace(microsecond=0) + offset,
         )
 
-    async def _async_prepare(self, method: str, data: dict) -> None:
+    def _prepare(self, method: str, response: dict | list, data: dict) -> None:
         """Prepare data.
 
         :param method: str
+        :param response: dict | list
         :param data: dict
         """
 
-        action = getattr(self, f"_async_prepare_{method}")
+        action = getattr(self, f"_prepare_{method}")
 
         if action is not None:
-            await action(data)
+            action(response, data)
 
-    async def _async_prepare_server(self, data: dict) -> None:
+    def _prepare_server(self, response: dict, data: dict) -> None:
         """Prepare server.
 
+        :param response: dict
         :param data: dict
         """
 
-        response: dict = await self.client.server()
-
-        if "version" in response:
+        if "version" in response and response["version"] != data.get(
+            ATTR_DEVICE_SW_VERSION
+        ):
             data[ATTR_DEVICE_SW_VERSION] = response["version"]
 
-    async def _async_prepare_account(self, data: dict) -> None:
+            # Sensors added later in this update read it before data is published
+            self._sw_version = response["version"]
+            self.__dict__.pop("device_info", None)
+
+    def _prepare_account(self, response: dict, data: dict) -> None:
         """Prepare account.
 
+        :param response: dict
         :param data: dict
         """
 
-        response: dict = await self.client.account()
-
         if ATTR_AVATAR_URL in response:
             data[ATTR_AVATAR_URL] = response[ATTR_AVATAR_URL]
 
-        for code in ("total", "usage"):
+        for code, (_code, name) in SPACE_SENSORS.items():
             if code in response and int(response[code]) >= 0:
-                _code: str = f"space_{code}"
-
                 data[_code] = int(response[code])
 
-                self._add_size_sensor(_code, f"Space {code}", EntityCategory.DIAGNOSTIC)
+                if _code not in self.sensors:
+                    self._add_size_sensor(_code, name, EntityCategory.DIAGNOSTIC)
 
-    async def _async_prepare_libraries(self, data: dict) -> None:
+    def _prepare_libraries(self, response: list, data: dict) -> None:
         """Prepare libraries.
 
+        :param response: list
         :param data: dict
         """
 
-        response: list = await self.client.libraries()
-
         for lib in response:
-            data[ATTR_REPOSITORIES][lib["id"]] = {
+            _id: str = lib["id"]
+
+            data[ATTR_REPOSITORIES][_id] = {
                 ATTR_REPOSITORY_SIZE: lib["size"],
                 ATTR_REPOSITORY_NAME: lib["name"],
             }
 
+            # Sensors are only ever added once, skip building their names
+            if (code := _id + "_used") in self.sensors:
+                continue
+
             self._add_size_sensor(
-                f"{lib['id']}_used",
+                code,
                 f"{lib['name']} used",
-                repository_code=lib["id"],
+                repository_code=_id,
                 custom_key=ATTR_REPOSITORY_SIZE,
             )
 
@@ -316,6 +350,34 @@ class SeafileEntityDescription:
     repository_code: str | None = None
 
 
+@callback
+def async_get_client(hass: HomeAssistant) -> AsyncClient:
+    """Return the AsyncClient shared by all Seafile entries.
+
+    :param hass: HomeAssistant
+    :return AsyncClient
+    """
+
+    if HTTPX_CLIENT not in hass.data:
+        hass.data[HTTPX_CLIENT] = create_async_httpx_client(
+            hass,
+            False,
+            # Newer Home Assistant passes its own limits to the client,
+            # so the pool limits go on the transport instead
+            transport=AsyncHTTPTransport(
+                verify=False,
+                http2=True,
+                limits=Limits(
+                    max_connections=CLIENT_MAX_CONNECTIONS,
+                    max_keepalive_connections=CLIENT_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=CLIENT_KEEPALIVE_EXPIRY,
+                ),
+            ),
+        )
+
+    return hass.data[HTTPX_CLIENT]
+
+
 @callback
 def async_get_updater(hass: HomeAssistant, identifier: str) -> SeafileUpdater:
     """Return SeafileUpdater for username or entry id.
@@ -325,11 +387,9 @@ def async_get_updater(hass: HomeAssistant, identifier: str) -> SeafileUpdater:
     :return SeafileUpdater
     """
 
-    if (
-        DOMAIN not in hass.data
-        or identifier not in hass.data[DOMAIN]
-        or UPDATER not in hass.data[DOMAIN][identifier]
-    ):
-        raise ValueError(f"Integration with identifier: {identifier} not found.")
-
-    return hass.data[DOMAIN][identifier][UPDATER]
+    try:
+        return hass.data[DOMAIN][identifier][UPDATER]
+    except KeyError as _e:
+        raise ValueError(
+            f"Integration with identifier: {identifier} not found."
+        ) from _e
@@ -1,30 +1,48 @@
 """"Seafile view."""
 
-# pylint: disable=import-outside-toplevel
-
 from __future__ import annotations
 
+import asyncio
 import io
 import logging
-import mimetypes
+import os
 import shlex
 import subprocess
-from hashlib import md5
+from collections import OrderedDict
+from hashlib import blake2b
 from http import HTTPStatus
 from typing import Any
 
 from aiohttp import web
-from aiohttp.hdrs import CACHE_CONTROL, ETAG
+from aiohttp.hdrs import ACCEPT, CACHE_CONTROL, ETAG, IF_NONE_MATCH, VARY
 from homeassistant.components.ffmpeg import FFmpegManager, get_ffmpeg_manager
 from homeassistant.components.http import HomeAssistantView
 from homeassistant.components.media_player.const import MEDIA_CLASS_VIDEO
 from homeassistant.core import HomeAssistant, callback
 
-from .const import DOMAIN, MIMETYPE_HEIC, MIMETYPE_JPEG, THUMBNAIL_SIZE
+from .const import (
+    DOMAIN,
+    MIMETYPE_HEIC,
+    MIMETYPE_JPEG,
+    THUMBNAIL_CACHE_SIZE,
+    THUMBNAIL_SIZE,
+)
 from .exceptions import SeafileError
-from .helper import decode_path, encode_path, get_short_mime, is_valid_uuid
+from .helper import (
+    decode_path,
+    encode_path,
+    get_short_mime,
+    guess_mime,
+    is_valid_uuid,
+)
 from .updater import SeafileUpdater, async_get_updater
 
+try:
+    import PIL.Image
+    import pyheif
+except ImportError:  # pragma: no cover
+    PIL = pyheif = None  # pylint: disable=invalid-name
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -35,6 +53,7 @@ def async_generate_thumbnail_url(
     repo_id: str,
     file_path: str,
     size: int = THUMBNAIL_SIZE,
+    mtime: int = 0,
 ) -> str:
     """Generate URL for event thumbnail.
 
@@ -43,15 +62,17 @@ def async_generate_thumbnail_url(
     :param repo_id: str: Repository id
     :param file_path: str: File path
     :param size: str: Size
+    :param mtime: int: File modification time
     :return str
     """
 
-    return ThumbnailProxyView.mask.format(
-        host=host.strip("/"),
-        entry_id=entry_id,
-        repo_id=repo_id,
-        size=size,
-        file_path=encode_path(file_path),
+    return ThumbnailProxyView.mask % (
+        host.strip("/"),
+        entry_id,
+        repo_id,
+        size,
+        mtime,
+        encode_path(file_path),
     )
 
 
@@ -60,8 +81,10 @@ class ThumbnailProxyView(HomeAssistantView):
 
     requires_auth: bool = False
 
-    mask: str = "{host}/api/seafile/thumbnail/{entry_id}/{repo_id}/{size}/{file_path}"
-    url: str = "/api/seafile/thumbnail/{entry_id}/{repo_id}/{size}/{file_path:.*}"
+    mask: str = "%s/api/seafile/thumbnail/%s/%s/%d/%d/%s"
+    url: str = (
+        "/api/seafile/thumbnail/{entry_id}/{repo_id}/{size}/{mtime}/{file_path:.*}"
+    )
     name: str = "api:seafile:thumbnail"
 
     def __init__(self, hass: HomeAssistant) -> None:
@@ -70,6 +93,11 @@ class ThumbnailProxyView(HomeAssistantView):
         self.hass = hass
         self.data = hass.data[DOMAIN]
 
+        self._cache: OrderedDict[tuple, tuple[bytes, str | None]] = OrderedDict()
+
+        # Conversions are CPU bound, keep them from flooding the shared executor
+        self._convert_semaphore = asyncio.Semaphore(os.cpu_count() or 4)
+
     # pylint: disable=too-many-arguments,too-many-locals
     async def get(
         self,
@@ -77,6 +105,7 @@ class ThumbnailProxyView(HomeAssistantView):
         entry_id: str,
         repo_id: str,
         size: int,
+        mtime: int,
         file_path: str,
     ) -> web.Response:
         """Get thumbnail
@@ -85,11 +114,15 @@ class ThumbnailProxyView(HomeAssistantView):
         :param entry_id: str: Entry id
         :param repo_id: str: Repository id
         :param size: int: Thumbnail size
+        :param mtime: int: File modification time
         :param file_path: str: File path
         :return web.Response
         """
 
-        size = int(size)  # sourcery skip
+        try:
+            size, mtime = int(size), int(mtime)
+        except ValueError:
+            return _404(f"Unable to find thumbnail: {size}/{mtime}/{file_path}")
 
         try:
             updater: SeafileUpdater = async_get_updater(self.hass, entry_id)
@@ -99,41 +132,142 @@ class ThumbnailProxyView(HomeAssistantView):
         if not is_valid_uuid(repo_id):
             return _404(f"Unable to find library with id: {repo_id}")
 
-        mime, _ = mimetypes.guess_type(file_path)
+        mime: str | None = guess_mime(file_path)
         short_mime = get_short_mime(mime)
 
+        is_heic: bool = mime == MIMETYPE_HEIC
+        # Originals are only worth sending in place of a full size conversion
+        is_native: bool = (
+            is_heic and size == 0 and _accepts_heic(request.headers.get(ACCEPT, ""))
+        )
+
+        key: tuple = (entry_id, repo_id, size, mtime, file_path, is_native)
+        etag: str | None = None
+
+        # Thumbnails are immutable per path, size and mtime, revalidate without
+        # fetching. Without a known mtime the file may have changed, so fetch it.
+        if mtime > 0:
+            etag = blake2b(":".join(map(str, key)).encode(), digest_size=16).hexdigest()
+
+            if request.headers.get(IF_NONE_MATCH) == etag:
+                return web.Response(
+                    status=HTTPStatus.NOT_MODIFIED,
+                    headers=_cache_headers(etag, is_heic),
+                )
+
+            if (cached := self._cache.get(key)) is not None:
+                self._cache.move_to_end(key)
+
+                return _thumbnail_response(*cached, etag, is_heic)
+
+        path: str = decode_path(file_path)
         thumbnail: bytes = b""
 
         try:
-            if mime == MIMETYPE_HEIC:
+            if is_native:
+                thumbnail = await updater.client.file(  # type: ignore
+                    repo_id, path, True
+                )
+            elif is_heic:
                 file: bytes = await updater.client.file(  # type: ignore
-                    repo_id, decode_path(file_path), True
+                    repo_id, path, True
                 )
 
                 mime = MIMETYPE_JPEG
-                thumbnail = await _convert_heic(file, size)
+
+                async with self._convert_semaphore:
+                    thumbnail = await self.hass.async_add_executor_job(
+                        _convert_heic, file, size
+                    )
             elif short_mime == MEDIA_CLASS_VIDEO:  # pragma: no cover
-                url: str = await updater.client.file(  # type: ignore
-                    repo_id, decode_path(file_path)
-                )
+                url: str = await updater.client.file(repo_id, path)  # type: ignore
 
                 mime = MIMETYPE_JPEG
-                thumbnail = await _convert_video(self.hass, url.strip('"'), size)
+
+                async with self._convert_semaphore:
+                    thumbnail = await _convert_video(self.hass, url.strip('"'), size)
             else:
-                thumbnail = await updater.client.thumbnail(
-                    repo_id, decode_path(file_path), size
-                )
+                thumbnail = await updater.client.thumbnail(repo_id, path, size)
         except (SeafileError, ValueError, ModuleNotFoundError):
             return _404("Thumbnail not found")
 
-        return web.Response(
-            body=thumbnail,
-            content_type=mime,
-            headers={
-                CACHE_CONTROL: "public, max-age=31622400",
-                ETAG: md5(thumbnail).hexdigest(),
-            },
-        )
+        # Full size conversions and originals are too heavy to keep in memory
+        if etag is not None and size > 0 and not is_native:
+            self._cache[key] = (thumbnail, mime)
+
+            if len(self._cache) > THUMBNAIL_CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+        return _thumbnail_response(thumbnail, mime, etag, is_heic)
+
+
+@callback
+def _accepts_heic(accept: str) -> bool:
+    """Whether the Accept header explicitly allows heic
+
+    :param accept: str: Accept header
+    :return bool
+    """
+
+    for media_range in accept.split(","):
+        media_type, *params = media_range.split(";")
+
+        if media_type.strip().lower() != MIMETYPE_HEIC:
+            continue
+
+        quality: float = 1.0
+
+        for param in params:
+            name, _, value = param.partition("=")
+
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+
+        return quality > 0
+
+    return False
+
+
+@callback
+def _cache_headers(etag: str | None, is_heic: bool = False) -> dict[str, str]:
+    """Cache headers
+
+    :param etag: str | None: None when the file mtime is unknown
+    :param is_heic: bool: Response depends on the Accept header
+    :return dict[str, str]
+    """
+
+    headers: dict[str, str] = (
+        {CACHE_CONTROL: "no-cache"}
+        if etag is None
+        else {CACHE_CONTROL: "public, max-age=31622400", ETAG: etag}
+    )
+
+    if is_heic:
+        headers[VARY] = ACCEPT
+
+    return headers
+
+
+@callback
+def _thumbnail_response(
+    thumbnail: bytes, mime: str | None, etag: str | None, is_heic: bool = False
+) -> web.Response:
+    """Thumbnail response
+
+    :param thumbnail: bytes
+    :param mime: str | None
+    :param etag: str | None
+    :param is_heic: bool
+    :return web.Response
+    """
+
+    return web.Response(
+        body=thumbnail, content_type=mime, headers=_cache_headers(etag, is_heic)
+    )
 
 
 @callback
@@ -147,7 +281,7 @@ def _404(message: Any) -> web.Response:
     return web.Response(body=message, status=HTTPStatus.NOT_FOUND)
 
 
-async def _convert_heic(data: bytes, size: int | None = None) -> bytes:
+def _convert_heic(data: bytes, size: int | None = None) -> bytes:
     """Convert heic
 
     :param data: bytes
@@ -155,21 +289,33 @@ async def _convert_heic(data: bytes, size: int | None = None) -> bytes:
     :return bytes
     """
 
-    import PIL.Image
-    import pyheif
+    if PIL is None or pyheif is None:  # pragma: no cover
+        raise ModuleNotFoundError("HEIC conversion requires pyheif and Pillow")
 
     heif_file: pyheif.HeifFile = pyheif.read(data)
 
     image: PIL.Image = PIL.Image.frombytes(
-        mode=heif_file.mode, size=heif_file.size, data=heif_file.data
+        heif_file.mode,
+        heif_file.size,
+        heif_file.data,
+        "raw",
+        heif_file.mode,
+        heif_file.stride,
     )
 
     if size and size > 0:
-        image.thumbnail((size, size))
+        image.thumbnail((size, size), PIL.Image.Resampling.BILINEAR)
 
     buffer = io.BytesIO()
 
-    image.save(buffer, format="jpeg")
+    image.save(
+        buffer,
+        format="jpeg",
+        quality=80,
+        subsampling=2,
+        optimize=False,
+        progressive=False,
+    )
 
     return buffer.getvalue()
 
@@ -201,8 +347,8 @@ async def _convert_video(
     return await hass.async_add_executor_job(
         _convert,
         str(
-            f"{manager.binary} -loglevel quiet -i "
-            f"{url} -frames:v 1 "
+            f"{manager.binary} -nostdin -threads 1 -loglevel quiet -i "
+            f"{shlex.quote(url)} -frames:v 1 "
             f"-vf scale=-2:{size} -q:v 3 -f image2 -"
         ),
     )
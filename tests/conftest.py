@@ -0,0 +1,60 @@
+"""Fixtures for the seafile component."""
+
+# pylint: disable=redefined-outer-name,unused-argument
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+import pytest
+import pytest_asyncio
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from tests.setup import async_mock_client, async_setup
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Enable custom integrations"""
+
+    yield
+
+
+@pytest_asyncio.fixture
+async def mock_client(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
+    """Mocked client class used by the updater"""
+
+    client = MagicMock()
+    await async_mock_client(client)
+
+    monkeypatch.setattr("custom_components.seafile.updater.SeafileClient", client)
+
+    return client
+
+
+@pytest.fixture
+def mock_dispatcher(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
+    """Mocked dispatcher used by the updater"""
+
+    dispatcher = MagicMock()
+
+    monkeypatch.setattr(
+        "custom_components.seafile.updater.async_dispatcher_send", dispatcher
+    )
+
+    return dispatcher
+
+
+@pytest_asyncio.fixture
+async def seafile_env(
+    hass: HomeAssistant, mock_client: MagicMock, mock_dispatcher: MagicMock
+) -> tuple[MockConfigEntry, MagicMock]:
+    """Loaded config entry backed by a mocked client"""
+
+    _, config_entry = await async_setup(hass)
+
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    return config_entry, mock_client
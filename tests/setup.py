@@ -4,12 +4,14 @@
 
 from __future__ import annotations
 
-import json
 import logging
 import urllib.parse
-from typing import Final
+from datetime import timedelta
+from functools import lru_cache
+from typing import Any, Final
 from unittest.mock import AsyncMock
 
+import orjson
 from homeassistant import setup
 from homeassistant.const import (
     CONF_PASSWORD,
@@ -19,11 +21,14 @@ from homeassistant.const import (
     CONF_USERNAME,
 )
 from homeassistant.core import HomeAssistant
+from homeassistant.util.dt import utcnow
 from pytest_homeassistant_custom_component.common import (
     MockConfigEntry,
+    async_fire_time_changed,
     get_fixture_path,
     load_fixture,
 )
+from pytest_httpx import HTTPXMock
 
 from custom_components.seafile.const import (
     CLIENT_URL,
@@ -33,11 +38,12 @@ from custom_components.seafile.const import (
     UPDATER,
 )
 from custom_components.seafile.helper import get_config_value
-from custom_components.seafile.updater import SeafileUpdater
+from custom_components.seafile.updater import SeafileUpdater, async_get_updater
 
 MOCK_URL: Final = "https://seafile.com"
 MOCK_USERNAME: Final = "test@seafile.com"
 MOCK_PASSWORD: Final = "12345678"
+MOCK_CLIENT_URL: Final = CLIENT_URL.format(url=MOCK_URL)
 
 OPTIONS_FLOW_DATA: Final = {
     CONF_URL: MOCK_URL,
@@ -47,6 +53,15 @@ OPTIONS_FLOW_DATA: Final = {
     CONF_SCAN_INTERVAL: DEFAULT_SCAN_INTERVAL,
 }
 
+MOCK_CLIENT_METHODS: Final = (
+    "login",
+    "account",
+    "server",
+    "libraries",
+    "file",
+    "thumbnail",
+)
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -84,39 +99,79 @@ async def async_setup(
     return updater, config_entry
 
 
+async def async_advance_time(
+    hass: HomeAssistant, seconds: int = DEFAULT_SCAN_INTERVAL + 1
+) -> None:
+    """Move time forward and wait for the scheduled updates
+
+    :param hass: HomeAssistant
+    :param seconds: int
+    """
+
+    async_fire_time_changed(hass, utcnow() + timedelta(seconds=seconds))
+    await hass.async_block_till_done()
+
+
+async def async_refresh(hass: HomeAssistant, entry_id: str) -> None:
+    """Refresh the updater directly instead of waiting for its schedule
+
+    :param hass: HomeAssistant
+    :param entry_id: str
+    """
+
+    await async_get_updater(hass, entry_id).async_refresh()
+    await hass.async_block_till_done()
+
+
 async def async_mock_client(mock_client) -> None:
     """Mock"""
 
-    mock_client.return_value.login = AsyncMock(
-        return_value=json.loads(load_fixture("login_data.json"))
-    )
-    mock_client.return_value.account = AsyncMock(
-        return_value=json.loads(load_fixture("account_data.json"))
-    )
-    mock_client.return_value.server = AsyncMock(
-        return_value=json.loads(load_fixture("server_data.json"))
-    )
-    mock_client.return_value.libraries = AsyncMock(
-        return_value=json.loads(load_fixture("libraries_data.json"))
-    )
+    responses: dict[str, Any] = {
+        "login": load_json_fixture("login_data.json"),
+        "account": load_json_fixture("account_data.json"),
+        "server": load_json_fixture("server_data.json"),
+        "libraries": load_json_fixture("libraries_data.json"),
+        "file": load_text_fixture("file_data.txt"),
+        "thumbnail": load_image_fixture("thumbnail_data.jpg"),
+        "directories": {
+            "/": load_json_fixture("dir_root_data.json"),
+            "/My Photos": load_json_fixture("dir_sub_data.json"),
+            "/My Photos/Camera": load_json_fixture("dir_sub_sub_data.json"),
+        },
+    }
+
+    for method in MOCK_CLIENT_METHODS:
+        setattr(
+            mock_client.return_value, method, AsyncMock(return_value=responses[method])
+        )
 
     async def mock_dir(repo_id: str, path: str | None) -> dict:
         """Mock channels"""
 
-        if path == "/My Photos":
-            return json.loads(load_fixture("dir_sub_data.json"))
+        return responses["directories"].get(path, responses["directories"]["/"])
 
-        if path == "/My Photos/Camera":
-            return json.loads(load_fixture("dir_sub_sub_data.json"))
+    mock_client.return_value.directories = AsyncMock(side_effect=mock_dir)
 
-        return json.loads(load_fixture("dir_root_data.json"))
 
-    mock_client.return_value.directories = AsyncMock(side_effect=mock_dir)
-    mock_client.return_value.file = AsyncMock(
-        return_value=load_fixture("file_data.txt")
-    )
-    mock_client.return_value.thumbnail = AsyncMock(
-        return_value=load_image_fixture("thumbnail_data.jpg")
+def stub_login(httpx_mock: HTTPXMock) -> None:
+    """Stub a successful login
+
+    :param httpx_mock: HTTPXMock
+    """
+
+    httpx_mock.add_response(text=load_text_fixture("login_data.json"), method="POST")
+
+
+def stub_login_error(httpx_mock: HTTPXMock, fixture: str, status: int = 400) -> None:
+    """Stub a failed login
+
+    :param httpx_mock: HTTPXMock
+    :param fixture: str: Error response fixture
+    :param status: int: Response status code
+    """
+
+    httpx_mock.add_response(
+        text=load_text_fixture(fixture), method="POST", status_code=status
     )
 
 
@@ -131,30 +186,41 @@ def get_url(
     :return: str
     """
 
-    path += "/"
+    query: str = (
+        f"?{urllib.parse.urlencode(query_params, doseq=True)}" if query_params else ""
+    )
 
-    if query_params is not None and len(query_params) > 0:
-        path += f"?{urllib.parse.urlencode(query_params, doseq=True)}"
+    return f"{MOCK_CLIENT_URL}/{path}/{query}"
 
-    return f"{CLIENT_URL.format(url=MOCK_URL)}/{path}"
 
+def load_json_fixture(filename: str) -> Any:
+    """Load json fixtures
 
-def load_image_fixture(filename: str) -> bytes:
-    """Load image fixtures"""
+    Parsed on every call, so tests never share mutable fixture data.
+    """
 
-    return get_fixture_path(filename, None).read_bytes()
+    return orjson.loads(load_text_fixture(filename))
 
 
-class MultipleSideEffect:  # pylint: disable=too-few-public-methods
-    """Multiple side effect"""
+@lru_cache(maxsize=None)
+def load_expected_json_fixture(filename: str) -> Any:
+    """Load json fixtures for assertions
+
+    Parsed once and shared, only compare against it and never pass it to mocks.
+    """
+
+    return orjson.loads(load_text_fixture(filename))
 
-    def __init__(self, *fns):
-        """init"""
 
-        self.funcs = iter(fns)
+@lru_cache(maxsize=None)
+def load_text_fixture(filename: str) -> str:
+    """Load text fixtures"""
 
-    def __call__(self, *args, **kwargs):
-        """call"""
+    return load_fixture(filename)
 
-        func = next(self.funcs)
-        return func(*args, **kwargs)
+
+@lru_cache(maxsize=None)
+def load_image_fixture(filename: str) -> bytes:
+    """Load image fixtures"""
+
+    return get_fixture_path(filename, None).read_bytes()
@@ -9,7 +9,6 @@ import logging
 import pytest
 from homeassistant.components.diagnostics import async_redact_data
 from homeassistant.core import HomeAssistant
-from pytest_homeassistant_custom_component.common import load_fixture
 from pytest_httpx import HTTPXMock
 
 from custom_components.seafile.const import DOMAIN, UPDATER
@@ -18,18 +17,11 @@ from custom_components.seafile.diagnostics import (
     async_get_config_entry_diagnostics,
 )
 from custom_components.seafile.updater import SeafileUpdater
-from tests.setup import async_setup, get_url
+from tests.setup import async_setup, get_url, load_text_fixture, stub_login
 
 _LOGGER = logging.getLogger(__name__)
 
 
-@pytest.fixture(autouse=True)
-def auto_enable_custom_integrations(enable_custom_integrations):
-    """Enable custom integrations"""
-
-    yield
-
-
 @pytest.mark.asyncio
 async def test_init(hass: HomeAssistant, httpx_mock: HTTPXMock) -> None:
     """Test init.
@@ -37,19 +29,21 @@ async def test_init(hass: HomeAssistant, httpx_mock: HTTPXMock) -> None:
     :param hass: HomeAssistant
     """
 
-    httpx_mock.add_response(text=load_fixture("login_data.json"), method="POST")
+    stub_login(httpx_mock)
     httpx_mock.add_response(
-        text=load_fixture("account_data.json"),
+        text=load_text_fixture("account_data.json"),
         method="GET",
         url=get_url("account/info"),
     )
     httpx_mock.add_response(
-        text=load_fixture("libraries_data.json"),
+        text=load_text_fixture("libraries_data.json"),
         method="GET",
         url=get_url("repos", {"type": "mine"}),
     )
     httpx_mock.add_response(
-        text=load_fixture("server_data.json"), method="GET", url=get_url("server-info")
+        text=load_text_fixture("server_data.json"),
+        method="GET",
+        url=get_url("server-info"),
     )
 
     _, config_entry = await async_setup(hass)
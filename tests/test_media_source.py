@@ -4,10 +4,12 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
-from datetime import timedelta
-from unittest.mock import AsyncMock, patch
+from typing import Final
+from unittest.mock import MagicMock
 
+import orjson
 import pytest
 from homeassistant.components import media_source
 from homeassistant.components.media_source import const
@@ -15,450 +17,165 @@ from homeassistant.components.media_source.error import MediaSourceError, Unreso
 from homeassistant.components.media_source.models import BrowseMediaSource, PlayMedia
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.network import get_url
-from homeassistant.setup import async_setup_component
-from homeassistant.util.dt import utcnow
-from pytest_homeassistant_custom_component.common import (
-    async_fire_time_changed,
-    load_fixture,
-)
+from pytest_homeassistant_custom_component.common import MockConfigEntry
 
-from custom_components.seafile.const import DEFAULT_SCAN_INTERVAL, DOMAIN
+from custom_components.seafile.const import DOMAIN
 from custom_components.seafile.exceptions import SeafileConnectionError
-from tests.setup import MOCK_URL, MOCK_USERNAME, async_mock_client, async_setup
-
-_LOGGER = logging.getLogger(__name__)
-
+from tests.setup import MOCK_URL, MOCK_USERNAME, load_text_fixture
 
-@pytest.fixture(autouse=True)
-def auto_enable_custom_integrations(enable_custom_integrations):
-    """Enable custom integrations"""
+MOCK_FILE_URL: Final = load_text_fixture("file_data.txt").strip('"')
 
-    yield
-
-
-@pytest.fixture(autouse=True)
-async def setup_media_source(hass) -> None:
-    """Set up media source."""
-    assert await async_setup_component(hass, "media_source", {})
+_LOGGER = logging.getLogger(__name__)
 
 
 @pytest.mark.asyncio
-async def test_media_source(hass: HomeAssistant) -> None:
+async def test_media_source(
+    hass: HomeAssistant, seafile_env: tuple[MockConfigEntry, MagicMock]
+) -> None:
     """Test media source.
 
     :param hass: HomeAssistant
+    :param seafile_env: tuple[MockConfigEntry, MagicMock]
     """
 
-    with patch("custom_components.seafile.updater.SeafileClient") as mock_client, patch(
-        "custom_components.seafile.updater.async_dispatcher_send"
-    ):
-        await async_mock_client(mock_client)
-
-        _, config_entry = await async_setup(hass)
-
-        assert await hass.config_entries.async_setup(config_entry.entry_id)
-        await hass.async_block_till_done()
-
-        async_fire_time_changed(
-            hass, utcnow() + timedelta(seconds=DEFAULT_SCAN_INTERVAL + 1)
-        )
-        await hass.async_block_till_done()
-
-        media: BrowseMediaSource = await media_source.async_browse_media(
-            hass,
-            f"{const.URI_SCHEME}{DOMAIN}",
-        )
-
-        assert media.as_dict() == {
-            "can_expand": True,
-            "can_play": False,
-            "children": [
-                {
-                    "can_expand": True,
-                    "can_play": False,
-                    "children_media_class": "directory",
-                    "media_class": "app",
-                    "media_content_id": f"media-source://{DOMAIN}/{config_entry.entry_id}",
-                    "media_content_type": "",
-                    "thumbnail": f"{MOCK_URL}/media/avatars/e/1/d853b3eb9e2d392f9a71139a5cd55c/resized/72/224b3d851f5a992def212ebb2dd6935f.png",
-                    "title": MOCK_USERNAME,
-                }
-            ],
-            "children_media_class": "app",
-            "media_class": "app",
-            "media_content_id": "media-source://seafile",
-            "media_content_type": "",
-            "not_shown": 0,
-            "thumbnail": None,
-            "title": "Seafile",
-        }
-
-        media = await media_source.async_browse_media(
-            hass,
-            f"{const.URI_SCHEME}{DOMAIN}/{config_entry.entry_id}",
-        )
-
-        assert media.as_dict() == {
-            "can_expand": True,
-            "can_play": False,
-            "children": [
-                {
-                    "can_expand": True,
-                    "can_play": False,
-                    "children_media_class": "directory",
-                    "media_class": "directory",
-                    "media_content_id": f"media-source://{DOMAIN}/{config_entry.entry_id}/704f23aa-e086-40a3-977e-7a07c798971d",
-                    "media_content_type": "",
-                    "thumbnail": None,
-                    "title": "Camera",
-                },
-                {
-                    "can_expand": True,
-                    "can_play": False,
-                    "children_media_class": "directory",
-                    "media_class": "directory",
-                    "media_content_id": f"media-source://{DOMAIN}/{config_entry.entry_id}/039e494b-2f2b-4716-940d-beecc654c8c8",
-                    "media_content_type": "",
-                    "thumbnail": None,
-                    "title": "Documents",
-                },
-            ],
-            "children_media_class": "directory",
-            "media_class": "app",
-            "media_content_id": f"media-source://{DOMAIN}/{config_entry.entry_id}",
-            "media_content_type": "",
-            "not_shown": 0,
-            "thumbnail": f"{MOCK_URL}/media/avatars/e/1/d853b3eb9e2d392f9a71139a5cd55c/resized/72/224b3d851f5a992def212ebb2dd6935f.png",
-            "title": MOCK_USERNAME,
-        }
-
-        media = await media_source.async_browse_media(
-            hass,
-            f"{const.URI_SCHEME}{DOMAIN}/{config_entry.entry_id}/704f23aa-e086-40a3-977e-7a07c798971d",
-        )
-
-        assert media.as_dict() == {
-            "can_expand": True,
-            "can_play": False,
-            "children": [
-                {
-                    "can_expand": True,
-                    "can_play": False,
-                    "children_media_class": "directory",
-                    "media_class": "directory",
-                    "media_content_id": f"media-source://{DOMAIN}/{config_entry.entry_id}/704f23aa-e086-40a3-977e-7a07c798971d/My "
-                    "Photos",
-                    "media_content_type": "",
-                    "thumbnail": None,
-                    "title": "My Photos",
-                },
-                {
-                    "can_expand": False,
-                    "can_play": True,
-                    "children_media_class": None,
-                    "media_class": "image",
-                    "media_content_id": f"media-source://{DOMAIN}/{config_entry.entry_id}/704f23aa-e086-40a3-977e-7a07c798971d/test.jpg",
-                    "media_content_type": "image",
-                    "thumbnail": f"{get_url(hass)}/api/{DOMAIN}/thumbnail/{config_entry.entry_id}/704f23aa-e086-40a3-977e-7a07c798971d/256/test.jpg",
-                    "title": "test.jpg",
-                },
-            ],
-            "children_media_class": "directory",
-            "media_class": "directory",
-            "media_content_id": f"media-source://{DOMAIN}/{config_entry.entry_id}/704f23aa-e086-40a3-977e-7a07c798971d",
-            "media_content_type": "",
-            "not_shown": 0,
-            "thumbnail": None,
-            "title": "Camera",
-        }
-
-        media = await media_source.async_browse_media(
-            hass,
-            f"{const.URI_SCHEME}{DOMAIN}/{config_entry.entry_id}/704f23aa-e086-40a3-977e-7a07c798971d/My Photos",
-        )
-
-        assert media.as_dict() == {
-            "can_expand": True,
-            "can_play": False,
-            "children": [
-                {
-                    "can_expand": True,
-                    "can_play": False,
-                    "children_media_class": "directory",
-                    "media_class": "directory",
-                    "media_content_id": f"media-source://{DOMAIN}/{config_entry.entry_id}/704f23aa-e086-40a3-977e-7a07c798971d/My "
-                    "Photos/Camera",
-                    "media_content_type": "",
-                    "thumbnail": None,
-                    "title": "Camera",
-                }
-            ],
-            "children_media_class": "directory",
-            "media_class": "directory",
-            "media_content_id": f"media-source://{DOMAIN}/{config_entry.entry_id}/704f23aa-e086-40a3-977e-7a07c798971d/My "
-            "Photos/My Photos",
-            "media_content_type": "",
-            "not_shown": 0,
-            "thumbnail": None,
-            "title": "My Photos",
-        }
-
-
-@pytest.mark.asyncio
-async def test_media_source_entry_error(hass: HomeAssistant) -> None:
-    """Test media source entry error.
-
-    :param hass: HomeAssistant
-    """
-
-    with patch("custom_components.seafile.updater.SeafileClient") as mock_client, patch(
-        "custom_components.seafile.updater.async_dispatcher_send"
-    ):
-        await async_mock_client(mock_client)
-
-        _, config_entry = await async_setup(hass)
-
-        assert await hass.config_entries.async_setup(config_entry.entry_id)
-        await hass.async_block_till_done()
-
-        async_fire_time_changed(
-            hass, utcnow() + timedelta(seconds=DEFAULT_SCAN_INTERVAL + 1)
-        )
-        await hass.async_block_till_done()
-
-        with pytest.raises(MediaSourceError) as error:
-            await media_source.async_browse_media(
-                hass,
-                f"{const.URI_SCHEME}{DOMAIN}/error",
+    config_entry, _ = seafile_env
+
+    # Listings embed runtime values, the cached fixture text only needs substitution
+    expected: list[dict] = orjson.loads(
+        load_text_fixture("media_source_browse_data.json")
+        .replace("{entry_id}", config_entry.entry_id)
+        .replace("{host}", get_url(hass))
+        .replace("{url}", MOCK_URL)
+        .replace("{username}", MOCK_USERNAME)
+    )
+
+    # Browsing is read only, later paths keep resolving while earlier ones are checked
+    tasks: list[asyncio.Task[BrowseMediaSource]] = [
+        asyncio.create_task(
+            media_source.async_browse_media(
+                hass, f"{const.URI_SCHEME}{DOMAIN}/{item['identifier']}".rstrip("/")
             )
-
-        assert str(error.value) == "Unable to find entry with id: error"
-
-
-@pytest.mark.asyncio
-async def test_media_source_uuid_error(hass: HomeAssistant) -> None:
-    """Test media source uuid error.
-
-    :param hass: HomeAssistant
-    """
-
-    with patch("custom_components.seafile.updater.SeafileClient") as mock_client, patch(
-        "custom_components.seafile.updater.async_dispatcher_send"
-    ):
-        await async_mock_client(mock_client)
-
-        _, config_entry = await async_setup(hass)
-
-        assert await hass.config_entries.async_setup(config_entry.entry_id)
-        await hass.async_block_till_done()
-
-        async_fire_time_changed(
-            hass, utcnow() + timedelta(seconds=DEFAULT_SCAN_INTERVAL + 1)
         )
-        await hass.async_block_till_done()
+        for item in expected
+    ]
 
-        with pytest.raises(MediaSourceError) as error:
-            await media_source.async_browse_media(
-                hass,
-                f"{const.URI_SCHEME}{DOMAIN}/{config_entry.entry_id}/error",
-            )
-
-        assert str(error.value) == "Unable to find library with id: error"
+    for task, item in zip(tasks, expected):
+        assert (await task).as_dict() == item["media"]
 
 
 @pytest.mark.asyncio
-async def test_media_source_updater_error(hass: HomeAssistant) -> None:
-    """Test media source updater error.
+@pytest.mark.parametrize(
+    "identifier,method,message",
+    [
+        ("error", None, "Unable to find entry with id: error"),
+        ("{entry_id}/error", None, "Unable to find library with id: error"),
+        (
+            "error/704f23aa-e086-40a3-977e-7a07c798971d",
+            None,
+            "Unable to find entry with id: error",
+        ),
+        (
+            "{entry_id}/704f23aa-e086-40a3-977e-7a07c798971d",
+            "directories",
+            "Unable to find path: /",
+        ),
+    ],
+)
+async def test_media_source_error(
+    hass: HomeAssistant,
+    seafile_env: tuple[MockConfigEntry, MagicMock],
+    identifier: str,
+    method: str | None,
+    message: str,
+) -> None:
+    """Test media source browse errors.
 
     :param hass: HomeAssistant
+    :param seafile_env: tuple[MockConfigEntry, MagicMock]
+    :param identifier: str
+    :param method: str | None: Client method that fails
+    :param message: str
     """
 
-    with patch("custom_components.seafile.updater.SeafileClient") as mock_client, patch(
-        "custom_components.seafile.updater.async_dispatcher_send"
-    ):
-        await async_mock_client(mock_client)
-
-        _, config_entry = await async_setup(hass)
+    config_entry, mock_client = seafile_env
 
-        assert await hass.config_entries.async_setup(config_entry.entry_id)
-        await hass.async_block_till_done()
+    if method:
+        getattr(mock_client.return_value, method).side_effect = SeafileConnectionError
 
-        async_fire_time_changed(
-            hass, utcnow() + timedelta(seconds=DEFAULT_SCAN_INTERVAL + 1)
+    with pytest.raises(MediaSourceError) as error:
+        await media_source.async_browse_media(
+            hass,
+            f"{const.URI_SCHEME}{DOMAIN}/"
+            + identifier.format(entry_id=config_entry.entry_id),
         )
-        await hass.async_block_till_done()
 
-        with pytest.raises(MediaSourceError) as error:
-            await media_source.async_browse_media(
-                hass,
-                f"{const.URI_SCHEME}{DOMAIN}/error/704f23aa-e086-40a3-977e-7a07c798971d",
-            )
-
-        assert str(error.value) == "Unable to find entry with id: error"
+    assert str(error.value) == message.format(entry_id=config_entry.entry_id)
 
 
 @pytest.mark.asyncio
-async def test_media_source_directories_error(hass: HomeAssistant) -> None:
-    """Test media source directories error.
+async def test_media_source_play(
+    hass: HomeAssistant, seafile_env: tuple[MockConfigEntry, MagicMock]
+) -> None:
+    """Test media source play.
 
     :param hass: HomeAssistant
+    :param seafile_env: tuple[MockConfigEntry, MagicMock]
     """
 
-    with patch("custom_components.seafile.updater.SeafileClient") as mock_client, patch(
-        "custom_components.seafile.updater.async_dispatcher_send"
-    ):
-        await async_mock_client(mock_client)
-        mock_client.return_value.directories = AsyncMock(
-            side_effect=SeafileConnectionError
-        )
+    config_entry, _ = seafile_env
 
-        _, config_entry = await async_setup(hass)
-
-        assert await hass.config_entries.async_setup(config_entry.entry_id)
-        await hass.async_block_till_done()
-
-        async_fire_time_changed(
-            hass, utcnow() + timedelta(seconds=DEFAULT_SCAN_INTERVAL + 1)
-        )
-        await hass.async_block_till_done()
-
-        with pytest.raises(MediaSourceError) as error:
-            await media_source.async_browse_media(
-                hass,
-                f"{const.URI_SCHEME}{DOMAIN}/{config_entry.entry_id}/704f23aa-e086-40a3-977e-7a07c798971d",
-            )
-
-        assert str(error.value) == "Unable to find path: /"
+    media = await media_source.async_resolve_media(
+        hass,
+        f"{const.URI_SCHEME}{DOMAIN}/{config_entry.entry_id}/704f23aa-e086-40a3-977e-7a07c798971d/test.jpg",
+        None,
+    )
+    assert media == PlayMedia(url=MOCK_FILE_URL, mime_type="image/jpeg")
 
 
 @pytest.mark.asyncio
-async def test_media_source_play(hass: HomeAssistant) -> None:
-    """Test media source play.
+@pytest.mark.parametrize(
+    "identifier,method,message",
+    [
+        ("{entry_id}/error/test.jpg", None, "Unable to find library with id: error"),
+        (
+            "error/704f23aa-e086-40a3-977e-7a07c798971d/test.jpg",
+            None,
+            "Unable to find entry with id: error",
+        ),
+        (
+            "{entry_id}/704f23aa-e086-40a3-977e-7a07c798971d/test.jpg",
+            "file",
+            "Could not resolve media item: {entry_id}/704f23aa-e086-40a3-977e-7a07c798971d/test.jpg",
+        ),
+    ],
+)
+async def test_media_source_play_error(
+    hass: HomeAssistant,
+    seafile_env: tuple[MockConfigEntry, MagicMock],
+    identifier: str,
+    method: str | None,
+    message: str,
+) -> None:
+    """Test media source play errors.
 
     :param hass: HomeAssistant
+    :param seafile_env: tuple[MockConfigEntry, MagicMock]
+    :param identifier: str
+    :param method: str | None: Client method that fails
+    :param message: str
     """
 
-    with patch("custom_components.seafile.updater.SeafileClient") as mock_client, patch(
-        "custom_components.seafile.updater.async_dispatcher_send"
-    ):
-        await async_mock_client(mock_client)
+    config_entry, mock_client = seafile_env
 
-        _, config_entry = await async_setup(hass)
+    if method:
+        getattr(mock_client.return_value, method).side_effect = SeafileConnectionError
 
-        assert await hass.config_entries.async_setup(config_entry.entry_id)
-        await hass.async_block_till_done()
-
-        async_fire_time_changed(
-            hass, utcnow() + timedelta(seconds=DEFAULT_SCAN_INTERVAL + 1)
-        )
-        await hass.async_block_till_done()
-
-        media = await media_source.async_resolve_media(
+    with pytest.raises(Unresolvable) as error:
+        await media_source.async_resolve_media(
             hass,
-            f"{const.URI_SCHEME}{DOMAIN}/{config_entry.entry_id}/704f23aa-e086-40a3-977e-7a07c798971d/test.jpg",
+            f"{const.URI_SCHEME}{DOMAIN}/"
+            + identifier.format(entry_id=config_entry.entry_id),
             None,
         )
-        assert media == PlayMedia(
-            url=load_fixture("file_data.txt").strip('"'), mime_type="image/jpeg"
-        )
-
-
-@pytest.mark.asyncio
-async def test_media_source_play_uuid_error(hass: HomeAssistant) -> None:
-    """Test media source play uuid error.
-
-    :param hass: HomeAssistant
-    """
-
-    with patch("custom_components.seafile.updater.SeafileClient") as mock_client, patch(
-        "custom_components.seafile.updater.async_dispatcher_send"
-    ):
-        await async_mock_client(mock_client)
-
-        _, config_entry = await async_setup(hass)
-
-        assert await hass.config_entries.async_setup(config_entry.entry_id)
-        await hass.async_block_till_done()
-
-        async_fire_time_changed(
-            hass, utcnow() + timedelta(seconds=DEFAULT_SCAN_INTERVAL + 1)
-        )
-        await hass.async_block_till_done()
-
-        with pytest.raises(Unresolvable) as error:
-            await media_source.async_resolve_media(
-                hass,
-                f"{const.URI_SCHEME}{DOMAIN}/{config_entry.entry_id}/error/test.jpg",
-                None,
-            )
-
-        assert str(error.value) == "Unable to find library with id: error"
-
-
-@pytest.mark.asyncio
-async def test_media_source_play_entry_error(hass: HomeAssistant) -> None:
-    """Test media source play entry error.
-
-    :param hass: HomeAssistant
-    """
-
-    with patch("custom_components.seafile.updater.SeafileClient") as mock_client, patch(
-        "custom_components.seafile.updater.async_dispatcher_send"
-    ):
-        await async_mock_client(mock_client)
-
-        _, config_entry = await async_setup(hass)
-
-        assert await hass.config_entries.async_setup(config_entry.entry_id)
-        await hass.async_block_till_done()
-
-        async_fire_time_changed(
-            hass, utcnow() + timedelta(seconds=DEFAULT_SCAN_INTERVAL + 1)
-        )
-        await hass.async_block_till_done()
-
-        with pytest.raises(Unresolvable) as error:
-            await media_source.async_resolve_media(
-                hass,
-                f"{const.URI_SCHEME}{DOMAIN}/error/704f23aa-e086-40a3-977e-7a07c798971d/test.jpg",
-                None,
-            )
-
-        assert str(error.value) == "Unable to find entry with id: error"
-
-
-@pytest.mark.asyncio
-async def test_media_source_play_url_error(hass: HomeAssistant) -> None:
-    """Test media source play url error.
-
-    :param hass: HomeAssistant
-    """
-
-    with patch("custom_components.seafile.updater.SeafileClient") as mock_client, patch(
-        "custom_components.seafile.updater.async_dispatcher_send"
-    ):
-        await async_mock_client(mock_client)
-
-        mock_client.return_value.file = AsyncMock(side_effect=SeafileConnectionError)
-
-        _, config_entry = await async_setup(hass)
-
-        assert await hass.config_entries.async_setup(config_entry.entry_id)
-        await hass.async_block_till_done()
-
-        async_fire_time_changed(
-            hass, utcnow() + timedelta(seconds=DEFAULT_SCAN_INTERVAL + 1)
-        )
-        await hass.async_block_till_done()
 
-        with pytest.raises(Unresolvable) as error:
-            await media_source.async_resolve_media(
-                hass,
-                f"{const.URI_SCHEME}{DOMAIN}/{config_entry.entry_id}/704f23aa-e086-40a3-977e-7a07c798971d/test.jpg",
-                None,
-            )
-
-        assert (
-            str(error.value)
-            == f"Could not resolve media item: {config_entry.entry_id}/704f23aa-e086-40a3-977e-7a07c798971d/test.jpg"
-        )
+    assert str(error.value) == message.format(entry_id=config_entry.entry_id)
@@ -4,190 +4,185 @@
 
 from __future__ import annotations
 
-import json
 import logging
-from datetime import timedelta
-from unittest.mock import AsyncMock, patch
+from typing import Final
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from homeassistant.components.sensor import ENTITY_ID_FORMAT as SENSOR_ENTITY_ID_FORMAT
 from homeassistant.const import STATE_UNAVAILABLE
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import entity_registry as er
-from homeassistant.util.dt import utcnow
-from pytest_homeassistant_custom_component.common import (
-    async_fire_time_changed,
-    load_fixture,
-)
 
 from custom_components.seafile.const import (
     ATTRIBUTION,
-    DEFAULT_SCAN_INTERVAL,
     DOMAIN,
     UPDATER,
 )
 from custom_components.seafile.exceptions import SeafileRequestError
 from custom_components.seafile.helper import generate_entity_id
+from custom_components.seafile.sensor import SeafileSensor
 from custom_components.seafile.updater import SeafileUpdater
-from tests.setup import MultipleSideEffect, async_mock_client, async_setup
-
-_LOGGER = logging.getLogger(__name__)
-
+from tests.setup import (
+    MOCK_USERNAME,
+    async_refresh,
+    async_setup,
+    load_json_fixture,
+)
 
-@pytest.fixture(autouse=True)
-def auto_enable_custom_integrations(enable_custom_integrations):
-    """Enable custom integrations"""
+SPACE_TOTAL_ID: Final = generate_entity_id(
+    SENSOR_ENTITY_ID_FORMAT, MOCK_USERNAME, "space_total"
+)
+SPACE_USAGE_ID: Final = generate_entity_id(
+    SENSOR_ENTITY_ID_FORMAT, MOCK_USERNAME, "space_usage"
+)
+CAMERA_USED_ID: Final = generate_entity_id(
+    SENSOR_ENTITY_ID_FORMAT, MOCK_USERNAME, "704f23aa-e086-40a3-977e-7a07c798971d_used"
+)
+DOCUMENTS_USED_ID: Final = generate_entity_id(
+    SENSOR_ENTITY_ID_FORMAT, MOCK_USERNAME, "039e494b-2f2b-4716-940d-beecc654c8c8_used"
+)
+NEW_USED_ID: Final = generate_entity_id(
+    SENSOR_ENTITY_ID_FORMAT, MOCK_USERNAME, "999e494b-2f2b-4716-940d-beecc654c8c8_used"
+)
 
-    yield
+_LOGGER = logging.getLogger(__name__)
 
 
 @pytest.mark.asyncio
-async def test_update_sensors(hass: HomeAssistant) -> None:
+async def test_update_sensors(hass: HomeAssistant, mock_client: MagicMock) -> None:
     """Test update sensors.
 
     :param hass: HomeAssistant
+    :param mock_client: MagicMock
     """
 
-    with patch("custom_components.seafile.updater.SeafileClient") as mock_client:
-        await async_mock_client(mock_client)
+    # The updater only reads responses, so one parsed copy serves every update
+    server_data: dict = load_json_fixture("server_data.json")
 
-        def success() -> dict:
-            return json.loads(load_fixture("server_data.json"))
-
-        def error() -> None:
-            raise SeafileRequestError
-
-        mock_client.return_value.server = AsyncMock(
-            side_effect=MultipleSideEffect(success, success, success, error)
-        )
+    mock_client.return_value.server = AsyncMock(
+        side_effect=[server_data, server_data, server_data, SeafileRequestError]
+    )
 
-        _, config_entry = await async_setup(hass)
+    _, config_entry = await async_setup(hass)
 
-        assert await hass.config_entries.async_setup(config_entry.entry_id)
-        await hass.async_block_till_done()
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
 
-        updater: SeafileUpdater = hass.data[DOMAIN][config_entry.entry_id][UPDATER]
-        registry = er.async_get(hass)
+    updater: SeafileUpdater = hass.data[DOMAIN][config_entry.entry_id][UPDATER]
+    registry = er.async_get(hass)
 
-        assert updater.last_update_success
+    assert updater.last_update_success
 
-        async_fire_time_changed(
-            hass, utcnow() + timedelta(seconds=DEFAULT_SCAN_INTERVAL + 30)
-        )
-        await hass.async_block_till_done()
+    await async_refresh(hass, config_entry.entry_id)
 
-        unique_id: str = _generate_id("space_total", updater.username)
-        entry = registry.async_get(unique_id)
+    entry = registry.async_get(SPACE_TOTAL_ID)
 
-        assert hass.states.get(unique_id) is None
-        assert entry is None
+    assert hass.states.get(SPACE_TOTAL_ID) is None
+    assert entry is None
 
-        state = hass.states.get(_generate_id("space_usage", updater.username))
-        assert state.state == str(81802066434)
-        assert state.name == "Space usage"
-        assert state.attributes["icon"] == "mdi:harddisk"
-        assert state.attributes["attribution"] == ATTRIBUTION
+    state = hass.states.get(SPACE_USAGE_ID)
+    assert state.state == str(81802066434)
+    assert state.name == "Space usage"
+    assert state.attributes["icon"] == "mdi:harddisk"
+    assert state.attributes["attribution"] == ATTRIBUTION
 
-        state = hass.states.get(
-            _generate_id("704f23aa-e086-40a3-977e-7a07c798971d_used", updater.username)
-        )
-        assert state.state == str(74256142158)
-        assert state.name == "Camera used"
-        assert state.attributes["icon"] == "mdi:harddisk"
-        assert state.attributes["attribution"] == ATTRIBUTION
+    state = hass.states.get(CAMERA_USED_ID)
+    assert state.state == str(74256142158)
+    assert state.name == "Camera used"
+    assert state.attributes["icon"] == "mdi:harddisk"
+    assert state.attributes["attribution"] == ATTRIBUTION
 
-        state = hass.states.get(
-            _generate_id("039e494b-2f2b-4716-940d-beecc654c8c8_used", updater.username)
-        )
-        assert state.state == str(7545924276)
-        assert state.name == "Documents used"
-        assert state.attributes["icon"] == "mdi:harddisk"
-        assert state.attributes["attribution"] == ATTRIBUTION
+    state = hass.states.get(DOCUMENTS_USED_ID)
+    assert state.state == str(7545924276)
+    assert state.name == "Documents used"
+    assert state.attributes["icon"] == "mdi:harddisk"
+    assert state.attributes["attribution"] == ATTRIBUTION
 
-        async_fire_time_changed(
-            hass, utcnow() + timedelta(seconds=DEFAULT_SCAN_INTERVAL + 1)
-        )
-        await hass.async_block_till_done()
+    await async_refresh(hass, config_entry.entry_id)
 
-        async_fire_time_changed(
-            hass, utcnow() + timedelta(seconds=DEFAULT_SCAN_INTERVAL + 1)
-        )
-        await hass.async_block_till_done()
+    await async_refresh(hass, config_entry.entry_id)
 
-        state = hass.states.get(_generate_id("space_usage", updater.username))
-        assert state.state == STATE_UNAVAILABLE
+    state = hass.states.get(SPACE_USAGE_ID)
+    assert state.state == STATE_UNAVAILABLE
 
-        state = hass.states.get(
-            _generate_id("704f23aa-e086-40a3-977e-7a07c798971d_used", updater.username)
-        )
-        assert state.state == STATE_UNAVAILABLE
+    state = hass.states.get(CAMERA_USED_ID)
+    assert state.state == STATE_UNAVAILABLE
 
-        state = hass.states.get(
-            _generate_id("039e494b-2f2b-4716-940d-beecc654c8c8_used", updater.username)
-        )
-        assert state.state == STATE_UNAVAILABLE
+    state = hass.states.get(DOCUMENTS_USED_ID)
+    assert state.state == STATE_UNAVAILABLE
 
 
 @pytest.mark.asyncio
-async def test_update_new_sensors(hass: HomeAssistant) -> None:
-    """Test update new sensors.
+async def test_update_sensors_snapshot(
+    hass: HomeAssistant, mock_client: MagicMock
+) -> None:
+    """Test sensors only write state for a changed snapshot.
 
     :param hass: HomeAssistant
+    :param mock_client: MagicMock
     """
 
-    with patch("custom_components.seafile.updater.SeafileClient") as mock_client:
-        await async_mock_client(mock_client)
+    account_data: dict = load_json_fixture("account_data.json")
+
+    mock_client.return_value.account = AsyncMock(
+        side_effect=[account_data, account_data, account_data | {"usage": 1024}]
+    )
+
+    _, config_entry = await async_setup(hass)
+
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    updater: SeafileUpdater = hass.data[DOMAIN][config_entry.entry_id][UPDATER]
+    previous: dict = updater.data
+
+    with patch.object(SeafileSensor, "async_write_ha_state") as mock_write:
+        await async_refresh(hass, config_entry.entry_id)
 
-        def success() -> dict:
-            return json.loads(load_fixture("libraries_data.json"))
+        assert updater.data is previous
+        mock_write.assert_not_called()
 
-        def success_two() -> dict:
-            return json.loads(load_fixture("libraries_change_data.json"))
+        await async_refresh(hass, config_entry.entry_id)
 
-        mock_client.return_value.libraries = AsyncMock(
-            side_effect=MultipleSideEffect(success, success_two)
-        )
+        assert updater.data is not previous
+        mock_write.assert_called_once()
 
-        _, config_entry = await async_setup(hass)
 
-        assert await hass.config_entries.async_setup(config_entry.entry_id)
-        await hass.async_block_till_done()
+@pytest.mark.asyncio
+async def test_update_new_sensors(hass: HomeAssistant, mock_client: MagicMock) -> None:
+    """Test update new sensors.
 
-        updater: SeafileUpdater = hass.data[DOMAIN][config_entry.entry_id][UPDATER]
-        registry = er.async_get(hass)
+    :param hass: HomeAssistant
+    :param mock_client: MagicMock
+    """
 
-        assert updater.last_update_success
+    mock_client.return_value.libraries = AsyncMock(
+        side_effect=[
+            load_json_fixture("libraries_data.json"),
+            load_json_fixture("libraries_change_data.json"),
+        ]
+    )
 
-        unique_id: str = _generate_id(
-            "999e494b-2f2b-4716-940d-beecc654c8c8_used", updater.username
-        )
-        entry: er.RegistryEntry | None = registry.async_get(unique_id)
+    _, config_entry = await async_setup(hass)
 
-        assert hass.states.get(unique_id) is None
-        assert entry is None
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
 
-        async_fire_time_changed(
-            hass, utcnow() + timedelta(seconds=DEFAULT_SCAN_INTERVAL + 30)
-        )
-        await hass.async_block_till_done()
+    updater: SeafileUpdater = hass.data[DOMAIN][config_entry.entry_id][UPDATER]
+    registry = er.async_get(hass)
 
-        state = hass.states.get(unique_id)
-        assert state.state == str(7745924276)
-        assert state.name == "New used"
-        assert state.attributes["icon"] == "mdi:harddisk"
-        assert state.attributes["attribution"] == ATTRIBUTION
+    assert updater.last_update_success
 
+    entry: er.RegistryEntry | None = registry.async_get(NEW_USED_ID)
 
-def _generate_id(code: str, username: str) -> str:
-    """Generate unique id
+    assert hass.states.get(NEW_USED_ID) is None
+    assert entry is None
 
-    :param code: str
-    :param username: str
-    :return str
-    """
+    await async_refresh(hass, config_entry.entry_id)
 
-    return generate_entity_id(
-        SENSOR_ENTITY_ID_FORMAT,
-        username,
-        code,
-    )
+    state = hass.states.get(NEW_USED_ID)
+    assert state.state == str(7745924276)
+    assert state.name == "New used"
+    assert state.attributes["icon"] == "mdi:harddisk"
+    assert state.attributes["attribution"] == ATTRIBUTION
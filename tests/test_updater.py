@@ -5,25 +5,17 @@
 from __future__ import annotations
 
 import logging
-from unittest.mock import patch
 
 import pytest
 from homeassistant.core import HomeAssistant
 
 from custom_components.seafile.const import DOMAIN, UPDATER
 from custom_components.seafile.updater import async_get_updater
-from tests.setup import async_mock_client, async_setup
+from tests.setup import async_setup
 
 _LOGGER = logging.getLogger(__name__)
 
 
-@pytest.fixture(autouse=True)
-def auto_enable_custom_integrations(enable_custom_integrations):
-    """Enable custom integrations"""
-
-    yield
-
-
 @pytest.mark.asyncio
 async def test_updater_schedule(hass: HomeAssistant) -> None:
     """Test updater schedule.
@@ -42,23 +34,21 @@ async def test_updater_schedule(hass: HomeAssistant) -> None:
 
 
 @pytest.mark.asyncio
+@pytest.mark.usefixtures("mock_client")
 async def test_updater_get_updater(hass: HomeAssistant) -> None:
     """Test updater get updater.
 
     :param hass: HomeAssistant
     """
 
-    with patch("custom_components.seafile.updater.SeafileClient") as mock_client:
-        await async_mock_client(mock_client)
-
-        _, config_entry = await async_setup(hass)
+    _, config_entry = await async_setup(hass)
 
-        assert await hass.config_entries.async_setup(config_entry.entry_id)
-        await hass.async_block_till_done()
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
 
-        assert hass.data[DOMAIN][config_entry.entry_id][UPDATER] == async_get_updater(
-            hass, config_entry.entry_id
-        )
+    assert hass.data[DOMAIN][config_entry.entry_id][UPDATER] == async_get_updater(
+        hass, config_entry.entry_id
+    )
 
-        with pytest.raises(ValueError):
-            async_get_updater(hass, "incorrect")
+    with pytest.raises(ValueError):
+        async_get_updater(hass, "incorrect")
@@ -4,263 +4,422 @@
 
 from __future__ import annotations
 
-import logging
-from datetime import timedelta
-from typing import cast
-from unittest.mock import AsyncMock, patch
+import io
+from typing import Final, cast
+from unittest.mock import MagicMock
 
+import PIL.Image
 import pytest
 from aiohttp import ClientResponse
+from aiohttp.hdrs import ACCEPT, CACHE_CONTROL, ETAG, IF_NONE_MATCH, VARY
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.network import get_url
-from homeassistant.util.dt import utcnow
-from pytest_homeassistant_custom_component.common import async_fire_time_changed
+from pytest_homeassistant_custom_component.common import MockConfigEntry
 from pytest_homeassistant_custom_component.test_util.aiohttp import mock_aiohttp_client
 
-from custom_components.seafile.const import DEFAULT_SCAN_INTERVAL, THUMBNAIL_SIZE
+from custom_components.seafile.const import THUMBNAIL_SIZE
 from custom_components.seafile.exceptions import SeafileConnectionError
-from custom_components.seafile.views import async_generate_thumbnail_url
-from tests.setup import async_mock_client, async_setup, load_image_fixture
+from custom_components.seafile.views import (
+    _accepts_heic,
+    _convert_heic,
+    async_generate_thumbnail_url,
+)
+from tests.setup import load_image_fixture
 
-_LOGGER = logging.getLogger(__name__)
-
-
-@pytest.fixture(autouse=True)
-def auto_enable_custom_integrations(enable_custom_integrations):
-    """Enable custom integrations"""
-
-    yield
+MOCK_THUMBNAIL: Final = load_image_fixture("thumbnail_data.jpg")
+MOCK_HEIC: Final = load_image_fixture("converted.heic")
+MOCK_REPO_ID: Final = "704f23aa-e086-40a3-977e-7a07c798971d"
+MOCK_MTIME: Final = 1458476496
 
 
 @pytest.mark.asyncio
-async def test_thumbnail(hass: HomeAssistant, hass_client: mock_aiohttp_client) -> None:
+@pytest.mark.parametrize(
+    "entry_id,repo_id,path,method,mock,status,body,content_type",
+    [
+        pytest.param(
+            "{entry_id}",
+            MOCK_REPO_ID,
+            "test.jpg",
+            None,
+            None,
+            200,
+            MOCK_THUMBNAIL,
+            "image/jpeg",
+            id="thumbnail",
+        ),
+        pytest.param(
+            "{entry_id}",
+            MOCK_REPO_ID,
+            "images/test.jpg",
+            None,
+            None,
+            200,
+            MOCK_THUMBNAIL,
+            "image/jpeg",
+            id="with_path",
+        ),
+        pytest.param(
+            "{entry_id}",
+            MOCK_REPO_ID,
+            "images/test.heic",
+            "file",
+            {"return_value": MOCK_HEIC},
+            200,
+            MOCK_THUMBNAIL,
+            "image/jpeg",
+            id="converted_heic",
+        ),
+        pytest.param(
+            "error",
+            MOCK_REPO_ID,
+            "test.jpg",
+            None,
+            None,
+            404,
+            b"Unable to find entry with id: error",
+            None,
+            id="entry_error",
+        ),
+        pytest.param(
+            "{entry_id}",
+            "error",
+            "test.jpg",
+            None,
+            None,
+            404,
+            b"Unable to find library with id: error",
+            None,
+            id="library_error",
+        ),
+        pytest.param(
+            "{entry_id}",
+            MOCK_REPO_ID,
+            "test.jpg",
+            "thumbnail",
+            {"side_effect": SeafileConnectionError},
+            404,
+            b"Thumbnail not found",
+            None,
+            id="api_error",
+        ),
+    ],
+)
+async def test_thumbnail(
+    hass: HomeAssistant,
+    hass_client: mock_aiohttp_client,
+    seafile_env: tuple[MockConfigEntry, MagicMock],
+    monkeypatch: pytest.MonkeyPatch,
+    entry_id: str,
+    repo_id: str,
+    path: str,
+    method: str | None,
+    mock: dict | None,
+    status: int,
+    body: bytes | None,
+    content_type: str | None,
+) -> None:
     """Test thumbnail.
 
     :param hass: HomeAssistant
     :param hass_client: mock_aiohttp_client
+    :param seafile_env: tuple[MockConfigEntry, MagicMock]
+    :param monkeypatch: pytest.MonkeyPatch
+    :param entry_id: str
+    :param repo_id: str
+    :param path: str
+    :param method: str | None: Client method to override
+    :param mock: dict | None: Attributes for the overridden mock
+    :param status: int
+    :param body: bytes | None
+    :param content_type: str | None
     """
 
-    with patch("custom_components.seafile.updater.SeafileClient") as mock_client, patch(
-        "custom_components.seafile.updater.async_dispatcher_send"
-    ):
-        await async_mock_client(mock_client)
+    config_entry, mock_client = seafile_env
+    base: str = get_url(hass)
 
-        _, config_entry = await async_setup(hass)
+    if method:
+        getattr(mock_client.return_value, method).configure_mock(**mock)
 
-        assert await hass.config_entries.async_setup(config_entry.entry_id)
-        await hass.async_block_till_done()
+    # Routing is under test here, the codec itself is covered by test_convert_heic
+    monkeypatch.setattr(
+        "custom_components.seafile.views._convert_heic",
+        MagicMock(return_value=MOCK_THUMBNAIL),
+    )
 
-        async_fire_time_changed(
-            hass, utcnow() + timedelta(seconds=DEFAULT_SCAN_INTERVAL + 1)
-        )
-        await hass.async_block_till_done()
+    url: str = async_generate_thumbnail_url(
+        base,
+        entry_id.format(entry_id=config_entry.entry_id),
+        repo_id,
+        path,
+        THUMBNAIL_SIZE,
+    )
 
-        url: str = async_generate_thumbnail_url(
-            get_url(hass),
-            config_entry.entry_id,
-            "704f23aa-e086-40a3-977e-7a07c798971d",
-            "test.jpg",
-            THUMBNAIL_SIZE,
-        )
+    http_client = await hass_client()
+    response = cast(ClientResponse, await http_client.get(url[len(base) :]))
 
-        http_client = await hass_client()
-        response = cast(
-            ClientResponse, await http_client.get(url.replace(get_url(hass), ""))
-        )
+    assert response.status == status
 
-        assert response.status == 200
-        assert await response.content.read() == load_image_fixture("thumbnail_data.jpg")
-        assert response.content_type == "image/jpeg"
+    if body is not None:
+        assert await response.read() == body
+
+    if content_type is not None:
+        assert response.content_type == content_type
 
 
 @pytest.mark.asyncio
-async def test_thumbnail_with_path(
-    hass: HomeAssistant, hass_client: mock_aiohttp_client
+@pytest.mark.parametrize(
+    "segments",
+    [
+        pytest.param("256/images/test.jpg", id="without_mtime"),
+        pytest.param("large/0/test.jpg", id="invalid_size"),
+    ],
+)
+async def test_thumbnail_invalid_url(
+    hass_client: mock_aiohttp_client,
+    seafile_env: tuple[MockConfigEntry, MagicMock],
+    segments: str,
 ) -> None:
-    """Test thumbnail.
+    """Test thumbnail with malformed url segments.
 
-    :param hass: HomeAssistant
     :param hass_client: mock_aiohttp_client
+    :param seafile_env: tuple[MockConfigEntry, MagicMock]
+    :param segments: str
     """
 
-    with patch("custom_components.seafile.updater.SeafileClient") as mock_client, patch(
-        "custom_components.seafile.updater.async_dispatcher_send"
-    ):
-        await async_mock_client(mock_client)
-
-        _, config_entry = await async_setup(hass)
+    config_entry, mock_client = seafile_env
 
-        assert await hass.config_entries.async_setup(config_entry.entry_id)
-        await hass.async_block_till_done()
+    http_client = await hass_client()
+    response = cast(
+        ClientResponse,
+        await http_client.get(
+            f"/api/seafile/thumbnail/{config_entry.entry_id}/{MOCK_REPO_ID}/{segments}"
+        ),
+    )
 
-        async_fire_time_changed(
-            hass, utcnow() + timedelta(seconds=DEFAULT_SCAN_INTERVAL + 1)
-        )
-        await hass.async_block_till_done()
-
-        url: str = async_generate_thumbnail_url(
-            get_url(hass),
-            config_entry.entry_id,
-            "704f23aa-e086-40a3-977e-7a07c798971d",
-            "images/test.jpg",
-            THUMBNAIL_SIZE,
-        )
-
-        http_client = await hass_client()
-        response = cast(
-            ClientResponse, await http_client.get(url.replace(get_url(hass), ""))
-        )
-
-        assert response.status == 200
-        assert await response.content.read() == load_image_fixture("thumbnail_data.jpg")
-        assert response.content_type == "image/jpeg"
+    assert response.status == 404
+    mock_client.return_value.thumbnail.assert_not_called()
 
 
 @pytest.mark.asyncio
-async def test_thumbnail_with_converted_heic(
-    hass: HomeAssistant, hass_client: mock_aiohttp_client
+async def test_thumbnail_cache(
+    hass: HomeAssistant,
+    hass_client: mock_aiohttp_client,
+    seafile_env: tuple[MockConfigEntry, MagicMock],
 ) -> None:
-    """Test thumbnail.
+    """Test thumbnail cache.
 
     :param hass: HomeAssistant
     :param hass_client: mock_aiohttp_client
+    :param seafile_env: tuple[MockConfigEntry, MagicMock]
     """
 
-    with patch("custom_components.seafile.updater.SeafileClient") as mock_client, patch(
-        "custom_components.seafile.updater.async_dispatcher_send"
-    ):
-        await async_mock_client(mock_client)
+    config_entry, mock_client = seafile_env
+    base: str = get_url(hass)
 
-        mock_client.return_value.file = AsyncMock(
-            return_value=load_image_fixture("converted.heic")
-        )
+    url: str = async_generate_thumbnail_url(
+        base,
+        config_entry.entry_id,
+        MOCK_REPO_ID,
+        "test.jpg",
+        THUMBNAIL_SIZE,
+        MOCK_MTIME,
+    )[len(base) :]
 
-        _, config_entry = await async_setup(hass)
+    http_client = await hass_client()
+    response = cast(ClientResponse, await http_client.get(url))
 
-        assert await hass.config_entries.async_setup(config_entry.entry_id)
-        await hass.async_block_till_done()
+    assert response.status == 200
+    etag: str = response.headers[ETAG]
 
-        async_fire_time_changed(
-            hass, utcnow() + timedelta(seconds=DEFAULT_SCAN_INTERVAL + 1)
-        )
-        await hass.async_block_till_done()
+    response = cast(ClientResponse, await http_client.get(url))
 
-        url: str = async_generate_thumbnail_url(
-            get_url(hass),
-            config_entry.entry_id,
-            "704f23aa-e086-40a3-977e-7a07c798971d",
-            "images/test.heic",
-            THUMBNAIL_SIZE,
-        )
+    assert response.status == 200
+    assert await response.read() == MOCK_THUMBNAIL
+    assert response.headers[ETAG] == etag
 
-        http_client = await hass_client()
-        response = cast(
-            ClientResponse, await http_client.get(url.replace(get_url(hass), ""))
-        )
+    response = cast(
+        ClientResponse,
+        await http_client.get(url, headers={IF_NONE_MATCH: etag}),
+    )
 
-        assert response.status == 200
-        assert response.content_type == "image/jpeg"
+    assert response.status == 304
+    assert mock_client.return_value.thumbnail.call_count == 1
+
+    url = async_generate_thumbnail_url(
+        base,
+        config_entry.entry_id,
+        MOCK_REPO_ID,
+        "test.jpg",
+        THUMBNAIL_SIZE,
+        MOCK_MTIME + 1,
+    )[len(base) :]
+
+    response = cast(
+        ClientResponse,
+        await http_client.get(url, headers={IF_NONE_MATCH: etag}),
+    )
+
+    assert response.status == 200
+    assert response.headers[ETAG] != etag
+    assert mock_client.return_value.thumbnail.call_count == 2
 
 
 @pytest.mark.asyncio
-async def test_thumbnail_error(
-    hass: HomeAssistant, hass_client: mock_aiohttp_client
+async def test_thumbnail_not_modified(
+    hass: HomeAssistant,
+    hass_client: mock_aiohttp_client,
+    seafile_env: tuple[MockConfigEntry, MagicMock],
 ) -> None:
-    """Test thumbnail error.
+    """Test thumbnail revalidation without fetching.
 
     :param hass: HomeAssistant
     :param hass_client: mock_aiohttp_client
+    :param seafile_env: tuple[MockConfigEntry, MagicMock]
     """
 
-    with patch("custom_components.seafile.updater.SeafileClient") as mock_client, patch(
-        "custom_components.seafile.updater.async_dispatcher_send"
-    ):
-        await async_mock_client(mock_client)
+    config_entry, mock_client = seafile_env
+    base: str = get_url(hass)
 
-        _, config_entry = await async_setup(hass)
+    url: str = async_generate_thumbnail_url(
+        base,
+        config_entry.entry_id,
+        MOCK_REPO_ID,
+        "test.jpg",
+        0,
+        MOCK_MTIME,
+    )[len(base) :]
 
-        assert await hass.config_entries.async_setup(config_entry.entry_id)
-        await hass.async_block_till_done()
+    http_client = await hass_client()
+    response = cast(ClientResponse, await http_client.get(url))
 
-        async_fire_time_changed(
-            hass, utcnow() + timedelta(seconds=DEFAULT_SCAN_INTERVAL + 1)
-        )
-        await hass.async_block_till_done()
+    assert response.status == 200
+    etag: str = response.headers[ETAG]
 
-        url: str = async_generate_thumbnail_url(
-            get_url(hass),
-            "error",
-            "704f23aa-e086-40a3-977e-7a07c798971d",
-            "test.jpg",
-            THUMBNAIL_SIZE,
-        )
+    response = cast(
+        ClientResponse,
+        await http_client.get(url, headers={IF_NONE_MATCH: etag}),
+    )
 
-        http_client = await hass_client()
-        response = cast(
-            ClientResponse, await http_client.get(url.replace(get_url(hass), ""))
-        )
+    assert response.status == 304
+    assert response.headers[ETAG] == etag
+    assert mock_client.return_value.thumbnail.call_count == 1
 
-        assert response.status == 404
-        assert await response.content.read() == b"Unable to find entry with id: error"
 
-        url = async_generate_thumbnail_url(
-            get_url(hass),
-            config_entry.entry_id,
-            "error",
-            "test.jpg",
-            THUMBNAIL_SIZE,
-        )
+@pytest.mark.asyncio
+async def test_thumbnail_without_mtime(
+    hass: HomeAssistant,
+    hass_client: mock_aiohttp_client,
+    seafile_env: tuple[MockConfigEntry, MagicMock],
+) -> None:
+    """Test thumbnail without a known mtime is always fetched.
 
-        http_client = await hass_client()
-        response = cast(
-            ClientResponse, await http_client.get(url.replace(get_url(hass), ""))
-        )
+    :param hass: HomeAssistant
+    :param hass_client: mock_aiohttp_client
+    :param seafile_env: tuple[MockConfigEntry, MagicMock]
+    """
+
+    config_entry, mock_client = seafile_env
+    base: str = get_url(hass)
+
+    url: str = async_generate_thumbnail_url(
+        base,
+        config_entry.entry_id,
+        MOCK_REPO_ID,
+        "test.jpg",
+    )[len(base) :]
 
-        assert response.status == 404
-        assert await response.content.read() == b"Unable to find library with id: error"
+    http_client = await hass_client()
+
+    for _ in range(2):
+        response = cast(ClientResponse, await http_client.get(url))
+
+        assert response.status == 200
+        assert response.headers[CACHE_CONTROL] == "no-cache"
+        assert ETAG not in response.headers
+
+    assert mock_client.return_value.thumbnail.call_count == 2
 
 
 @pytest.mark.asyncio
-async def test_thumbnail_api_error(
-    hass: HomeAssistant, hass_client: mock_aiohttp_client
+async def test_thumbnail_with_native_heic(
+    hass: HomeAssistant,
+    hass_client: mock_aiohttp_client,
+    seafile_env: tuple[MockConfigEntry, MagicMock],
+    monkeypatch: pytest.MonkeyPatch,
 ) -> None:
-    """Test thumbnail api error.
+    """Test full size heic without conversion, sized thumbnails are converted.
 
     :param hass: HomeAssistant
     :param hass_client: mock_aiohttp_client
+    :param seafile_env: tuple[MockConfigEntry, MagicMock]
+    :param monkeypatch: pytest.MonkeyPatch
     """
 
-    with patch("custom_components.seafile.updater.SeafileClient") as mock_client, patch(
-        "custom_components.seafile.updater.async_dispatcher_send"
-    ):
-        await async_mock_client(mock_client)
+    config_entry, mock_client = seafile_env
+    base: str = get_url(hass)
 
-        mock_client.return_value.thumbnail = AsyncMock(
-            side_effect=SeafileConnectionError
-        )
+    mock_client.return_value.file.return_value = MOCK_HEIC
 
-        _, config_entry = await async_setup(hass)
+    monkeypatch.setattr(
+        "custom_components.seafile.views._convert_heic",
+        MagicMock(return_value=MOCK_THUMBNAIL),
+    )
 
-        assert await hass.config_entries.async_setup(config_entry.entry_id)
-        await hass.async_block_till_done()
-
-        async_fire_time_changed(
-            hass, utcnow() + timedelta(seconds=DEFAULT_SCAN_INTERVAL + 1)
-        )
-        await hass.async_block_till_done()
+    http_client = await hass_client()
 
+    for size, content_type, body in (
+        (0, "image/heic", MOCK_HEIC),
+        (THUMBNAIL_SIZE, "image/jpeg", MOCK_THUMBNAIL),
+    ):
         url: str = async_generate_thumbnail_url(
-            get_url(hass),
+            base,
             config_entry.entry_id,
-            "704f23aa-e086-40a3-977e-7a07c798971d",
-            "test.jpg",
-            THUMBNAIL_SIZE,
+            MOCK_REPO_ID,
+            "images/test.heic",
+            size,
         )
 
-        http_client = await hass_client()
         response = cast(
-            ClientResponse, await http_client.get(url.replace(get_url(hass), ""))
+            ClientResponse,
+            await http_client.get(url[len(base) :], headers={ACCEPT: "image/heic,*/*"}),
         )
 
-        assert response.status == 404
-        assert await response.content.read() == b"Thumbnail not found"
+        assert response.status == 200
+        assert response.content_type == content_type
+        assert response.headers[VARY] == ACCEPT
+        assert await response.read() == body
+
+
+@pytest.mark.parametrize(
+    "accept,expected",
+    [
+        ("image/heic,*/*", True),
+        ("image/webp, IMAGE/HEIC;q=0.8", True),
+        ("image/heic;q=0", False),
+        ("image/heic; q=0.0, */*", False),
+        ("image/heic;q=invalid", False),
+        ("image/heic-sequence,*/*", False),
+        ("*/*", False),
+        ("", False),
+    ],
+)
+def test_accepts_heic(accept: str, expected: bool) -> None:
+    """Test heic negotiation.
+
+    :param accept: str
+    :param expected: bool
+    """
+
+    assert _accepts_heic(accept) is expected
+
+
+def test_convert_heic() -> None:
+    """Test heic conversion."""
+
+    thumbnail: bytes = _convert_heic(MOCK_HEIC, THUMBNAIL_SIZE)
+
+    assert thumbnail.startswith(b"\xff\xd8\xff")
+
+    with PIL.Image.open(io.BytesIO(thumbnail)) as image:
+        assert image.format == "JPEG"
+        assert max(image.size) <= THUMBNAIL_SIZE